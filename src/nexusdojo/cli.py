@@ -5,37 +5,35 @@ Command-line interface for the NexusDojo scaffold.
 from __future__ import annotations
 
 import argparse
+import bisect
+import functools
+import hashlib
+import itertools
 import json
 import os
-import platform
 import random
 import re
+import select
 import shlex
-import shutil
 import sys
-import subprocess
 import threading
 import termios
 import time
-import urllib.error
-import urllib.request
 import tty
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping, Optional
 
 from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
 from rich import box
 from rich.prompt import Prompt, Confirm
-from rich.markdown import Markdown
 from rich.align import Align
 from rich.live import Live
 from rich.spinner import Spinner
 from rich.text import Text
-from rich.tree import Tree
-from rich.syntax import Syntax
 
 from . import __version__
 
@@ -49,7 +47,9 @@ console = Console()
 # parents[0] = src/nexusdojo
 # parents[1] = src
 # parents[2] = repo_root
-REPO_ROOT = Path(__file__).resolve().parents[2]
+# Resolved once: every path below derives from it, so import does a single realpath().
+PACKAGE_DIR = Path(__file__).resolve().parent
+REPO_ROOT = PACKAGE_DIR.parents[1]
 
 # Default workspace location for local knowledge artifacts.
 DEFAULT_WORKSPACE = REPO_ROOT / "nexusdojo_data"
@@ -60,15 +60,51 @@ DEFAULT_NOTES_ROOT = REPO_ROOT / "notes"
 # Location of bundled templates (relative to repo root).
 TEMPLATES_ROOT = REPO_ROOT / "templates"
 # Location of static, in-package main.py templates for kata scaffolds.
-STATIC_TEMPLATES_ROOT = Path(__file__).resolve().parent / "templates"
+STATIC_TEMPLATES_ROOT = PACKAGE_DIR / "templates"
 # Default model settings for idea generation.
 DEFAULT_IDEA_PROVIDER = "ollama"
 DEFAULT_IDEA_MODEL = "qwen2.5-coder:1.5b"
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 OLLAMA_URL = "http://127.0.0.1:11434/api/chat"
+# Wire payloads and machine-only cache files skip json's default ", " / ": " padding.
+COMPACT_JSON_SEPARATORS = (",", ":")
+# Disk cache for LLM generations (ideas, missions, scaffolds), relative to the notes root.
+LLM_CACHE_DIRNAME = ".llm_cache"
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+# Trailing lines of a streaming LLM reply shown under the progress spinner.
+STREAM_PREVIEW_LINES = 8
+# Recent ideas keyed by hint signature, reused while fresh even when the log tail changed.
+IDEA_SEMCACHE_FILENAME = ".idea_semcache.json"
+IDEA_SEMCACHE_TTL_SECONDS = 60 * 60
+IDEA_SEMCACHE_PER_SIGNATURE = 5
+IDEA_SEMCACHE_MAX_SIGNATURES = 32
 # Relaxed rate limits (unlimited daily, short debounce)
 HINT_COOLDOWN_SECONDS = 5
 HINT_MAX_PER_DAY = 9999  # Effectively unlimited
+# Hint uses are appended as "project<TAB>timestamp" lines; the log is compacted past this size.
+HINT_LOG_FILENAME = "hints_log.tsv"
+HINT_LEGACY_LOG_FILENAME = "hints_log.json"
+HINT_LOG_COMPACT_BYTES = 64 * 1024
+# How much of a kata README to scan for its "Template: ..." marker.
+TEMPLATE_MARKER_MAX_BYTES = 4096
+# unittest output markers used when trimming and summarizing test failures.
+FAILURE_HEADER_PREFIXES = ("FAIL:", "ERROR:")
+FAILURE_SUMMARY_PREFIXES = FAILURE_HEADER_PREFIXES + ("Traceback",)
+TRACEBACK_FILE_PREFIX = "File "
+# Leading markers stripped from LLM bullet lists.
+BULLET_PREFIXES = ("-", "*", "•")
+# Leading markdown heading markers ("## ").
+HEADING_PREFIX_RE = re.compile(r"^#+\s*")
+# Log and calibration files are streamed line by line through a buffer this large.
+LOG_READ_BUFFER_SIZE = 1 << 20
+# Every log entry line starts "- [YYYY-MM-DD HH:MM]"; the bytes form serves raw scans.
+LOG_ENTRY_PREFIX = "- ["
+LOG_ENTRY_PREFIX_BYTES = LOG_ENTRY_PREFIX.encode("ascii")
+# A whole entry as handle_log writes it: fixed-width stamp, an optional "project:" prefix (no
+# spaces), then the note (a leading ":" from central-log formatting is dropped).
+LOG_LINE_RE = re.compile(
+    r"- \[\s*([0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2})\s*\]\s*:?\s*(?:([^ :]+):)?(.*)"
+)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -110,28 +146,56 @@ def read_key() -> str:
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
 
 
-def build_parser() -> argparse.ArgumentParser:
+def interruptible_pause(seconds: float) -> None:
     """
-    Build the argument parser with subcommands.
+    Pause for a message to be read, returning early once the user presses Enter.
+    Non-interactive stdin just sleeps.
     """
-    parser = argparse.ArgumentParser(
-        prog="dojo",
-        description="Local CLI scaffold for NexusDojo.",
-    )
-    subparsers = parser.add_subparsers(dest="command", required=False)
+    try:
+        interactive = sys.stdin.isatty()
+    except (AttributeError, ValueError):
+        interactive = False
+    if not interactive:
+        time.sleep(seconds)
+        return
+    ready, _, _ = select.select([sys.stdin], [], [], seconds)
+    if ready:
+        sys.stdin.readline()
 
+
+def wait_for_enter(message: str = "Press Enter to return to menu") -> None:
+    """
+    Block until Enter, rendered like Prompt.ask but without building a Prompt each time.
+    """
+    console.input(f"{message}: ")
+
+
+def add_hello_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the hello subcommand.
+    """
     hello_parser = subparsers.add_parser(
         "hello",
         help="Print a quickstart reminder.",
     )
     hello_parser.set_defaults(func=handle_hello)
 
+
+def add_info_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the info subcommand.
+    """
     info_parser = subparsers.add_parser(
         "info",
         help="Show environment details.",
     )
     info_parser.set_defaults(func=handle_info)
 
+
+def add_init_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the init subcommand.
+    """
     init_parser = subparsers.add_parser(
         "init",
         help="Create a local workspace skeleton.",
@@ -148,6 +212,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     init_parser.set_defaults(func=handle_init)
 
+
+def add_prompt_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the prompt subcommand.
+    """
     prompt_parser = subparsers.add_parser(
         "prompt",
         help="Display a stored system prompt for reference.",
@@ -159,6 +228,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     prompt_parser.set_defaults(func=handle_prompt)
 
+
+def add_api_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the api-dry-run subcommand.
+    """
     api_parser = subparsers.add_parser(
         "api-dry-run",
         help="Build an API request payload using env vars (no network call).",
@@ -186,6 +260,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     api_parser.set_defaults(func=handle_api_dry_run)
 
+
+def add_start_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the start subcommand.
+    """
     start_parser = subparsers.add_parser(
         "start",
         help="Create a new kata from a template.",
@@ -265,6 +344,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     start_parser.set_defaults(func=handle_start)
 
+
+def add_refresh_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the scaffold-refresh subcommand.
+    """
     refresh_parser = subparsers.add_parser(
         "scaffold-refresh",
         help="Regenerate missing scaffold files for a kata without touching user code.",
@@ -280,6 +364,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     refresh_parser.set_defaults(func=handle_scaffold_refresh)
 
+
+def add_idea_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the idea subcommand.
+    """
     idea_parser = subparsers.add_parser(
         "idea",
         help="Generate kata ideas based on your logs and calibrations.",
@@ -327,6 +416,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     idea_parser.set_defaults(func=handle_idea)
 
+
+def add_log_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the log subcommand.
+    """
     log_parser = subparsers.add_parser(
         "log",
         help="Record a note for a kata.",
@@ -352,6 +446,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     log_parser.set_defaults(func=handle_log)
 
+
+def add_brief_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the brief subcommand.
+    """
     brief_parser = subparsers.add_parser(
         "brief",
         help="Summarize recent logs and write a brief.",
@@ -372,6 +471,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     brief_parser.set_defaults(func=handle_brief)
 
+
+def add_calibrate_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the calibrate subcommand.
+    """
     calibrate_parser = subparsers.add_parser(
         "calibrate",
         help="Log a quick self-assessment for a skill pillar.",
@@ -401,6 +505,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     calibrate_parser.set_defaults(func=handle_calibrate)
 
+
+def add_dashboard_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the dashboard subcommand.
+    """
     dashboard_parser = subparsers.add_parser(
         "dashboard",
         help="Show a session dashboard with progress signals.",
@@ -417,6 +526,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     dashboard_parser.set_defaults(func=handle_dashboard)
 
+
+def add_continue_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the continue subcommand.
+    """
     continue_parser = subparsers.add_parser(
         "continue",
         help="Show the most recent kata and next-step hints.",
@@ -433,6 +547,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     continue_parser.set_defaults(func=handle_continue)
 
+
+def add_transcript_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the transcript subcommand.
+    """
     transcript_parser = subparsers.add_parser(
         "transcript",
         help="Append a manual transcript or summary note.",
@@ -454,6 +573,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     transcript_parser.set_defaults(func=handle_transcript)
 
+
+def add_hint_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the hint subcommand.
+    """
     hint_parser = subparsers.add_parser(
         "hint",
         help="Pull a concise, rate-limited hint for a kata.",
@@ -500,6 +624,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     hint_parser.set_defaults(func=handle_hint)
 
+
+def add_test_hint_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the test-hints subcommand.
+    """
     test_hint_parser = subparsers.add_parser(
         "test-hints",
         help="Generate edge-case test TODOs for a kata (skipped tests).",
@@ -547,6 +676,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     test_hint_parser.set_defaults(func=handle_test_hints)
 
+
+def add_menu_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the menu subcommand.
+    """
     # Friendly menu when no command is provided.
     menu_parser = subparsers.add_parser(
         "menu",
@@ -554,6 +688,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     menu_parser.set_defaults(func=handle_menu)
 
+
+def add_check_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the check subcommand.
+    """
     check_parser = subparsers.add_parser(
         "check",
         help="Run tests and get AI feedback.",
@@ -575,6 +714,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     check_parser.set_defaults(func=handle_check)
 
+
+def add_watch_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the watch subcommand.
+    """
     watch_parser = subparsers.add_parser(
         "watch",
         help="Continuously run tests on file changes.",
@@ -596,12 +740,22 @@ def build_parser() -> argparse.ArgumentParser:
     )
     watch_parser.set_defaults(func=handle_watch)
 
+
+def add_play_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the play subcommand.
+    """
     play_parser = subparsers.add_parser(
         "play",
         help="Open a temporary playground for experimentation.",
     )
     play_parser.set_defaults(func=handle_play)
 
+
+def add_solve_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the solve subcommand.
+    """
     solve_parser = subparsers.add_parser(
         "solve",
         help="Generate a solution for the current kata (Zero XP).",
@@ -613,6 +767,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     solve_parser.set_defaults(func=handle_solve)
 
+
+def add_reset_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Register the reset subcommand.
+    """
     reset_parser = subparsers.add_parser(
         "reset",
         help="Reset main.py to the initial boilerplate.",
@@ -624,6 +783,61 @@ def build_parser() -> argparse.ArgumentParser:
     )
     reset_parser.set_defaults(func=handle_reset)
 
+
+# Subcommand name -> function adding its parser, in help order.
+SUBCOMMAND_BUILDERS: dict[str, Callable[[argparse._SubParsersAction], None]] = {
+    "hello": add_hello_parser,
+    "info": add_info_parser,
+    "init": add_init_parser,
+    "prompt": add_prompt_parser,
+    "api-dry-run": add_api_parser,
+    "start": add_start_parser,
+    "scaffold-refresh": add_refresh_parser,
+    "idea": add_idea_parser,
+    "log": add_log_parser,
+    "brief": add_brief_parser,
+    "calibrate": add_calibrate_parser,
+    "dashboard": add_dashboard_parser,
+    "continue": add_continue_parser,
+    "transcript": add_transcript_parser,
+    "hint": add_hint_parser,
+    "test-hints": add_test_hint_parser,
+    "menu": add_menu_parser,
+    "check": add_check_parser,
+    "watch": add_watch_parser,
+    "play": add_play_parser,
+    "solve": add_solve_parser,
+    "reset": add_reset_parser,
+}
+
+
+def sniff_subcommand(argv: list[str]) -> Optional[str]:
+    """
+    Return the subcommand argv will dispatch to, or None when it is absent or not a known command.
+    """
+    return argv[0] if argv and argv[0] in SUBCOMMAND_BUILDERS else None
+
+
+# One slot per subcommand plus the full parser built when no command is given.
+@functools.lru_cache(maxsize=len(SUBCOMMAND_BUILDERS) + 1)
+def build_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Build the argument parser with subcommands.
+    Given a command, only that subparser gets its arguments; the rest are bare placeholders so
+    the usage line still lists every command.
+    Cached: parse_args never mutates the parser and every default is a module constant.
+    """
+    parser = argparse.ArgumentParser(
+        prog="dojo",
+        description="Local CLI scaffold for NexusDojo.",
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    subparsers = parser.add_subparsers(dest="command", required=False)
+    for name, add_subparser in SUBCOMMAND_BUILDERS.items():
+        if command is None or name == command:
+            add_subparser(subparsers)
+        else:
+            subparsers.add_parser(name)
     return parser
 
 
@@ -631,7 +845,6 @@ def handle_watch(args: argparse.Namespace) -> int:
     """
     Watch for file changes and auto-run dojo check (Polling Mode - Optimized for Speed).
     """
-    import time
     
     kata_root = Path(args.root).expanduser()
     if args.project:
@@ -890,7 +1103,7 @@ def handle_check(args: argparse.Namespace) -> int:
         kata_meta_path = project_dir / ".kata.json"
         if kata_meta_path.exists():
             try:
-                meta = json.loads(kata_meta_path.read_text())
+                meta = json.loads(kata_meta_path.read_bytes())
                 pillar = meta.get("pillar", "mixed")
                 cheated = meta.get("cheated", False)
 
@@ -899,11 +1112,13 @@ def handle_check(args: argparse.Namespace) -> int:
                         console.print("[dim]XP forfeited (Solution Used).[/dim]")
                     elif not auto_log:
                         console.print(f"[bold]Rate this drill ([cyan]{pillar.upper()}[/cyan]):[/bold]")
-                        console.print("[1] Too Easy  (Speed +5 XP)")
-                        console.print("[2] Perfect   (Growth +15 XP)")
-                        console.print("[3] Too Hard  (Grit +20 XP)")
+                        console.print(
+                            "[1] Too Easy  (Speed +5 XP)\n"
+                            "[2] Perfect   (Growth +15 XP)\n"
+                            "[3] Too Hard  (Grit +20 XP)"
+                        )
                         rating = Prompt.ask("Rating", choices=["1", "2", "3"], default="2")
-                        xp_gain, new_level = update_skill(Path(args.notes_root), pillar, rating)
+                        xp_gain, new_level = update_skill(notes_root, pillar, rating)
                         console.print(Panel(
                             f"XP Gained: [bold gold1]+{xp_gain}[/bold gold1]\n"
                             f"New Level: [bold cyan]{new_level}[/bold cyan]",
@@ -913,31 +1128,27 @@ def handle_check(args: argparse.Namespace) -> int:
 
                 if auto_log and not cheated:
                      # In silent mode, we award standard XP (Perfect=15) silently
-                     update_skill(Path(args.notes_root), pillar, "2")
+                     update_skill(notes_root, pillar, "2")
 
             except Exception as e:
                 if not silent_mode:
                     console.print(f"[dim]XP update failed: {e}[/dim]")
 
-        # Auto-log logic
+        # Auto-log logic: one Namespace for either path, the note is filled in below.
+        log_args = argparse.Namespace(
+            project=project_dir.name,
+            note=None,
+            root=str(kata_root),
+            notes_root=str(notes_root),
+        )
         if auto_log:
             # Silent Log
-            note = "Tests passed (Watch Mode Auto-Log)"
-            handle_log(argparse.Namespace(
-                project=project_dir.name,
-                note=note,
-                root=str(kata_root),
-                notes_root=str(args.notes_root)
-            ))
+            log_args.note = "Tests passed (Watch Mode Auto-Log)"
+            handle_log(log_args)
         elif not silent_mode:
             if Confirm.ask("Log this victory?"):
-                note = Prompt.ask("What did you learn/build?")
-                handle_log(argparse.Namespace(
-                    project=project_dir.name,
-                    note=note,
-                    root=str(kata_root),
-                    notes_root=str(args.notes_root)
-                ))
+                log_args.note = Prompt.ask("What did you learn/build?")
+                handle_log(log_args)
         return (0, None) if collect_failure else 0
 
     else:
@@ -951,7 +1162,7 @@ def handle_check(args: argparse.Namespace) -> int:
             capturing = False
             for line in lines:
                 # Start capturing at the first failure/error header or traceback
-                if line.startswith(("FAIL:", "ERROR:", "Traceback")):
+                if line.startswith(FAILURE_SUMMARY_PREFIXES):
                     capturing = True
                 if capturing:
                     summary.append(line)
@@ -1009,11 +1220,11 @@ def handle_check(args: argparse.Namespace) -> int:
             test_name = ""
             first_line = ""
             for line in fail_lines:
-                if line.startswith(("FAIL:", "ERROR:")):
+                if line.startswith(FAILURE_HEADER_PREFIXES):
                     test_name = line.split(":", 1)[1].strip()
                     break
             for line in fail_lines:
-                if line.strip().startswith("File ") and ", line " in line:
+                if line.strip().startswith(TRACEBACK_FILE_PREFIX) and ", line " in line:
                     first_line = line.strip()
                     break
             failure_detail = {
@@ -1025,6 +1236,22 @@ def handle_check(args: argparse.Namespace) -> int:
         return 1
 
 
+def dump_json(obj: Any) -> bytes:
+    """
+    Encode metadata as indented UTF-8 JSON bytes, ready for Path.write_bytes.
+    """
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write bytes to a sibling temp file and swap it into place, so readers never see a partial file.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
 # --- Skill / XP System ---
 
 def load_skills(notes_root: Path) -> dict[str, int]:
@@ -1032,31 +1259,24 @@ def load_skills(notes_root: Path) -> dict[str, int]:
     if not path.exists():
         return {"python": 0, "cli": 0, "api": 0, "testing": 0, "mixed": 0}
     try:
-        return json.loads(path.read_text())
+        return json.loads(path.read_bytes())
     except json.JSONDecodeError:
         return {"python": 0, "cli": 0, "api": 0, "testing": 0, "mixed": 0}
 
 def save_skills(notes_root: Path, skills: dict[str, int]) -> None:
     path = notes_root / "skills.json"
-    path.write_text(json.dumps(skills, indent=2))
+    path.write_bytes(dump_json(skills))
+
+
+# Display labels for known pillars; anything else is title-cased.
+PILLAR_LABELS = {"cli": "CLI", "api": "API", "python": "Python", "testing": "Testing", "mixed": "Mixed"}
 
 
 def format_pillar_label(pillar: str) -> str:
     """
     Normalize pillar labels for display (e.g., CLI, API).
     """
-    p = pillar.lower()
-    if p == "cli":
-        return "CLI"
-    elif p == "api":
-        return "API"
-    elif p == "python":
-        return "Python"
-    elif p == "testing":
-        return "Testing"
-    elif p == "mixed":
-        return "Mixed"
-    return pillar.title()
+    return PILLAR_LABELS.get(pillar.lower()) or pillar.title()
 
 
 def summarize_failure_output(output: str, max_lines: int = 20, max_chars: int = 1200) -> str:
@@ -1127,18 +1347,18 @@ if __name__ == \"__main__\":
     return tutorial_dir
 
 
+# XP thresholds (exclusive upper bounds) for each level title; "Master" lies beyond the last.
+LEVEL_THRESHOLDS = (100, 300, 600, 1000)
+LEVEL_TITLES = ("Novice", "Apprentice", "Journeyman", "Expert", "Master")
+
+
+@functools.lru_cache(maxsize=512)
 def get_level_info(xp: int) -> tuple[str, str]:
     """Returns (Level Title, Next Level Progress)."""
-    if xp < 100:
-        return "Novice", f"{xp}/100"
-    elif xp < 300:
-        return "Apprentice", f"{xp}/300"
-    elif xp < 600:
-        return "Journeyman", f"{xp}/600"
-    elif xp < 1000:
-        return "Expert", f"{xp}/1000"
-    else:
-        return "Master", "MAX"
+    idx = bisect.bisect_right(LEVEL_THRESHOLDS, xp)
+    if idx == len(LEVEL_THRESHOLDS):
+        return LEVEL_TITLES[idx], "MAX"
+    return LEVEL_TITLES[idx], f"{xp}/{LEVEL_THRESHOLDS[idx]}"
 
 def update_skill(notes_root: Path, pillar: str, rating: str) -> tuple[int, str]:
     """
@@ -1184,6 +1404,28 @@ def get_failure_diagnosis(project_name: str, traceback: str, notes_root: Path) -
     return hint
 
 
+MISSION_TEST_HEADER = (
+    '"""Auto-generated mission tests. Implement these to complete the kata."""\n'
+    "import unittest\n"
+    "import main # Assuming main.py contains your logic\n"
+    "\n"
+    "class MissionTests(unittest.TestCase):"
+)
+
+
+def _emit_mission_test(idx: int, criteria: str) -> str:
+    """
+    Render one skipped acceptance-criteria test method for test_mission.py.
+    """
+    safe_criteria = summarize_text(criteria, 80).replace("'", "\"")
+    return (
+        f"    @unittest.skip(f'TODO: Implement for: {safe_criteria}')\n"
+        f"    def test_acceptance_criteria_{idx}(self):\n"
+        f"        # Test: {criteria}\n"
+        "        self.fail('Test not implemented yet')\n"
+    )
+
+
 def generate_mission_spec(
     project_dir: Path,
     idea_line: str,
@@ -1225,20 +1467,26 @@ def generate_mission_spec(
     
     spec_json = None
     fallback_used = False
-    if not offline:
-        content = call_idea_api(DEFAULT_IDEA_PROVIDER, DEFAULT_IDEA_MODEL, messages)
-        if content:
-            text = content.strip()
-            if "{" in text and "}" in text:
-                start = text.find("{")
-                end = text.rfind("}")
-                if start != -1 and end != -1:
-                    text = text[start : end + 1]
-            try:
-                spec_json = json.loads(text)
-            except json.JSONDecodeError:
-                preview = (text or content or "")[:200]
-                print(f"Error parsing mission spec JSON: {preview}...", file=sys.stderr)
+    # Offline runs still reuse a previously cached mission for the same request.
+    content = call_idea_api(
+        DEFAULT_IDEA_PROVIDER,
+        DEFAULT_IDEA_MODEL,
+        messages,
+        cache_dir=notes_root / LLM_CACHE_DIRNAME,
+        cache_only=offline,
+    )
+    if content:
+        text = content.strip()
+        if "{" in text and "}" in text:
+            start = text.find("{")
+            end = text.rfind("}")
+            if start != -1 and end != -1:
+                text = text[start : end + 1]
+        try:
+            spec_json = json.loads(text)
+        except json.JSONDecodeError:
+            preview = (text or content or "")[:200]
+            print(f"Error parsing mission spec JSON: {preview}...", file=sys.stderr)
 
     if not spec_json:
         fallback_used = True
@@ -1288,49 +1536,48 @@ def generate_mission_spec(
     tests_dir.mkdir(parents=True, exist_ok=True)
     test_file_path = tests_dir / "test_mission.py"
     
-    test_lines = [
-        '"""Auto-generated mission tests. Implement these to complete the kata."""',
-        "import unittest",
-        "import main # Assuming main.py contains your logic",
-        "",
-        "class MissionTests(unittest.TestCase):",
-    ]
-    
-    for idx, criteria in enumerate(acceptance_criteria):
-        safe_criteria = summarize_text(criteria, 80).replace("'", "\"")
-        test_lines.extend([
-            f"    @unittest.skip(f'TODO: Implement for: {safe_criteria}')",
-            f"    def test_acceptance_criteria_{idx + 1}(self):",
-            f"        # Test: {criteria}",
-            "        self.fail('Test not implemented yet')",
-            "",
-        ])
-    
-    # Add a final placeholder test if no criteria were generated
-    if not acceptance_criteria:
-         test_lines.extend([
-            f"    @unittest.skip(f'TODO: Implement mission for: {idea_title}')",
-            f"    def test_mission_placeholder(self):",
-            f"        self.fail('Mission tests not generated or implemented')",
-            "",
-        ])
-    
-    test_file_path.write_text("\n".join(test_lines))
+    # Each criterion becomes one pre-formatted block; the file body is joined once.
+    if acceptance_criteria:
+        test_blocks = [
+            _emit_mission_test(idx, criteria)
+            for idx, criteria in enumerate(acceptance_criteria, start=1)
+        ]
+    else:
+        # Add a final placeholder test if no criteria were generated
+        test_blocks = [
+            f"    @unittest.skip(f'TODO: Implement mission for: {idea_title}')\n"
+            "    def test_mission_placeholder(self):\n"
+            "        self.fail('Mission tests not generated or implemented')\n"
+        ]
+
+    test_file_path.write_text(MISSION_TEST_HEADER + "\n" + "\n".join(test_blocks))
 
     return "\n".join(md_lines), acceptance_criteria, fallback_used
 
 
-def build_mission_header_comments(project_dir: Path, max_lines: int = 120, max_chars: int = 4000) -> list[str]:
+# Detects a mission header previously injected at the top of main.py.
+MISSION_INJECTED_RE = re.compile(r"\s*# --- MISSION\.md")
+
+
+def build_mission_header_comments(
+    project_dir: Path,
+    max_lines: int = 120,
+    max_chars: int = 4000,
+    mission_text: Optional[str] = None,
+) -> list[str]:
     """
     Read MISSION.md and return a concise commented block for in-file reference.
+    Pass mission_text when the content is already in memory to skip the read.
     """
-    mission_path = project_dir / "MISSION.md"
-    if not mission_path.exists():
-        return []
-    try:
-        raw_lines = mission_path.read_text(encoding="utf-8", errors="ignore").splitlines()
-    except Exception:
-        return []
+    if mission_text is None:
+        mission_path = project_dir / "MISSION.md"
+        if not mission_path.exists():
+            return []
+        try:
+            mission_text = mission_path.read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            return []
+    raw_lines = mission_text.splitlines()
 
     header = ["# --- MISSION.md (synced for quick reference) ---"]
     total = 0
@@ -1356,6 +1603,8 @@ def handle_info(args: argparse.Namespace) -> int:
     """
     Display environment info and allow editing profile settings.
     """
+    import platform
+
     console.print(Panel(f"NexusDojo CLI v{__version__}", title="System Info", border_style="blue"))
     
     # Environment stats
@@ -1428,8 +1677,10 @@ Rate the difficulty to adjust future drills:
 ---
 *Tip: Use `dojo hint` if you get stuck.*
     """
+    from rich.markdown import Markdown
+
     console.print(Panel(Markdown(guide), title="Recommended Workflow", border_style="green"))
-    Prompt.ask("Press Enter to return to menu")
+    wait_for_enter()
     return 0
 
 
@@ -1481,7 +1732,7 @@ def handle_settings(args: argparse.Namespace) -> int:
             settings["ai_enabled"] = not settings.get("ai_enabled", True)
             save_settings(notes_root, settings)
             console.print(f"\n[green]AI Integration {'enabled' if settings['ai_enabled'] else 'disabled'}.[/green]")
-            Prompt.ask("Press Enter to continue")
+            wait_for_enter("Press Enter to continue")
 
         elif choice == "2":
             # Configure Provider
@@ -1497,7 +1748,7 @@ def handle_settings(args: argparse.Namespace) -> int:
                 settings["ai_model"] = "openai/gpt-4o-mini"  # Default openrouter model
             save_settings(notes_root, settings)
             console.print(f"\n[green]Provider set to {settings['ai_provider']}.[/green]")
-            Prompt.ask("Press Enter to continue")
+            wait_for_enter("Press Enter to continue")
 
         elif choice == "3":
             # Configure Model
@@ -1518,7 +1769,7 @@ def handle_settings(args: argparse.Namespace) -> int:
                 settings["ai_model"] = model_input
             save_settings(notes_root, settings)
             console.print(f"\n[green]Model set to {settings['ai_model']}.[/green]")
-            Prompt.ask("Press Enter to continue")
+            wait_for_enter("Press Enter to continue")
 
         elif choice == "4":
             # Toggle remember user
@@ -1533,7 +1784,7 @@ def handle_settings(args: argparse.Namespace) -> int:
             else:
                 default_profile_file.unlink(missing_ok=True)
                 console.print(f"\n[green]Remember User disabled. You'll see the login page next time.[/green]")
-            Prompt.ask("Press Enter to continue")
+            wait_for_enter("Press Enter to continue")
 
         elif choice == "5":
             break
@@ -1592,7 +1843,7 @@ def run_onboarding(notes_root: Path) -> int:
     
     console.print(wf_grid)
     
-    Prompt.ask("\nPress Enter to enter the Dojo")
+    wait_for_enter("\nPress Enter to enter the Dojo")
     
     # Redirect to main menu
     return handle_menu(argparse.Namespace())
@@ -1632,8 +1883,7 @@ def handle_prompt(args: argparse.Namespace) -> int:
     """
     prompt_path = Path(args.file)
     if not prompt_path.is_absolute():
-        repo_root = Path(__file__).resolve().parents[2]
-        prompt_path = (repo_root / prompt_path).resolve()
+        prompt_path = (REPO_ROOT / prompt_path).resolve()
 
     if not prompt_path.exists():
         print(f"Prompt file not found: {prompt_path}", file=sys.stderr)
@@ -1676,6 +1926,51 @@ def handle_api_dry_run(args: argparse.Namespace) -> int:
 
 
 
+# Guided-start settings and their allowed values; the first letter doubles as a form shortcut.
+START_SETTING_CHOICES = {
+    "pillar": ("python", "cli", "api", "testing", "mixed"),
+    "mode": ("script", "fastapi", "rag", "mcp"),
+    "level": ("foundation", "proficient", "stretch"),
+    "tests": ("edge", "smoke", "skip"),
+}
+START_SETTING_SHORTCUTS = {name[0]: name for name in START_SETTING_CHOICES}
+
+
+def prompt_settings_form(defaults: dict[str, str]) -> dict[str, str]:
+    """
+    Show all guided-start settings at once and read overrides in a single answer.
+    Enter accepts the defaults; otherwise e.g. `p=python,m=fastapi,l=stretch,t=edge`.
+    """
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold cyan")
+    table.add_column("Key", style="cyan")
+    table.add_column("Setting")
+    table.add_column("Value", style="bold")
+    table.add_column("Choices", style="dim")
+    for name, choices in START_SETTING_CHOICES.items():
+        table.add_row(name[0], name, defaults[name], "/".join(choices))
+    console.print(table)
+
+    while True:
+        answer = console.input(
+            "Press Enter to accept, or override (e.g. [cyan]p=python,m=fastapi,l=stretch,t=edge[/cyan]): "
+        ).strip()
+        values = dict(defaults)
+        errors = []
+        for item in filter(None, (part.strip() for part in re.split(r"[,\s]+", answer))):
+            key, _, value = item.partition("=")
+            name = START_SETTING_SHORTCUTS.get(key.strip().lower(), key.strip().lower())
+            value = value.strip().lower()
+            if name not in START_SETTING_CHOICES:
+                errors.append(f"unknown setting '{key}'")
+            elif value not in START_SETTING_CHOICES[name]:
+                errors.append(f"{name} must be one of {'/'.join(START_SETTING_CHOICES[name])}")
+            else:
+                values[name] = value
+        if not errors:
+            return values
+        console.print(f"[red]{'; '.join(errors)}[/red]")
+
+
 def handle_start(args: argparse.Namespace) -> int:
     """
     Create a kata from a template and stamp it with basic metadata.
@@ -1700,26 +1995,18 @@ def handle_start(args: argparse.Namespace) -> int:
         args.reuse_settings = False
 
     if prompt_user and not args.reuse_settings:
-        pillar_hint = Prompt.ask(
-            "Focus pillar (python/cli/api/testing/mixed)",
-            default=pillar_hint or "mixed",
-            choices=["python", "cli", "api", "testing", "mixed"],
-        )
-        mode_hint = Prompt.ask(
-            "Mode/template (script/fastapi/rag/mcp)",
-            default=mode_hint or "script",
-            choices=["script", "fastapi", "rag", "mcp"],
-        )
-        level_hint = Prompt.ask(
-            "Difficulty (foundation/proficient/stretch)",
-            default=level_hint or "foundation",
-            choices=["foundation", "proficient", "stretch"],
-        )
-        tests_pref = Prompt.ask(
-            "Test scaffolding (edge/smoke/skip)",
-            default=tests_pref or "edge",
-            choices=["edge", "smoke", "skip"],
+        form = prompt_settings_form(
+            {
+                "pillar": pillar_hint or "mixed",
+                "mode": mode_hint or "script",
+                "level": level_hint or "foundation",
+                "tests": tests_pref or "edge",
+            }
         )
+        pillar_hint = form["pillar"]
+        mode_hint = form["mode"]
+        level_hint = form["level"]
+        tests_pref = form["tests"]
         save_settings(
             notes_root,
             {
@@ -1756,11 +2043,12 @@ def handle_start(args: argparse.Namespace) -> int:
                     offline=offline_mode,
                 )
             if options:
-                console.print("Pick a kata:")
-                for idx, opt in enumerate(options, start=1):
-                    console.print(f"[cyan]{idx})[/cyan] {strip_idea_prefix(opt)}")
-                console.print("[cyan]m)[/cyan] Manual idea")
-                console.print("[cyan]c)[/cyan] Cancel")
+                console.print("\n".join([
+                    "Pick a kata:",
+                    *(f"[cyan]{idx})[/cyan] {strip_idea_prefix(opt)}" for idx, opt in enumerate(options, start=1)),
+                    "[cyan]m)[/cyan] Manual idea",
+                    "[cyan]c)[/cyan] Cancel",
+                ]))
                 choice = Prompt.ask("Choose", default="1").strip().lower()
                 if choice in {"c", "cancel"}:
                     console.print("Canceled.")
@@ -1819,7 +2107,15 @@ def handle_start(args: argparse.Namespace) -> int:
     kata_root.mkdir(parents=True, exist_ok=True)
     target_dir = kata_root / slug
 
-    if target_dir.exists() and any(target_dir.iterdir()) and not args.force:
+    # One scandir entry is enough to know the directory is occupied; a missing one is free.
+    occupied = False
+    if not args.force:
+        try:
+            with os.scandir(target_dir) as it:
+                occupied = next(it, None) is not None
+        except FileNotFoundError:
+            pass
+    if occupied:
         alt_slug = next_available_slug(slug_base, kata_root)
         if not sys.stdin.isatty() or args.yes:
             console.print(f"[yellow]Kata directory {target_dir} exists; using alternate slug {alt_slug}.[/yellow]")
@@ -1843,22 +2139,22 @@ def handle_start(args: argparse.Namespace) -> int:
         print(f"Template not found: {template_dir}", file=sys.stderr)
         return 1
 
-    shutil.copytree(template_dir, target_dir, dirs_exist_ok=args.force)
-
-    # Always drop in the static, annotated main.py for this template.
-    static_main = STATIC_TEMPLATES_ROOT / resolved_template / "main.py"
-    if static_main.exists():
-        shutil.copy(static_main, target_dir / "main.py")
-    else:
-        console.print(f"[yellow]Warning:[/yellow] Static main.py not found for template '{resolved_template}'. Using packaged template version.")
-
+    # One clock read stamps both the README placeholders and .kata.json.
+    created_at = datetime.now()
     replacements = {
         "IDEA": idea_title,
         "SLUG": slug,
         "TEMPLATE": resolved_template,
-        "CREATED_AT": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "CREATED_AT": format_log_stamp(created_at),
     }
-    apply_placeholders_tree(target_dir, replacements)
+    # Placeholders are filled as the template is written, so no second pass rereads the files.
+    write_template_files(template_dir, target_dir, dirs_exist_ok=args.force, replacements=replacements)
+
+    # Always use the static, annotated main.py for this template. It is held in memory and
+    # written once, together with the mission header, further below.
+    static_main_content = load_static_main(resolved_template)
+    if static_main_content is None:
+        console.print(f"[yellow]Warning:[/yellow] Static main.py not found for template '{resolved_template}'. Using packaged template version.")
     
     # Generate MISSION.md and test_mission.py
     mission_md_content, acceptance_criteria, fallback_used_mission = generate_mission_spec(
@@ -1875,29 +2171,41 @@ def handle_start(args: argparse.Namespace) -> int:
         print("Note: LLM unavailable for mission spec; using curated fallback.", file=sys.stderr)
 
     # Mission Injection Logic
-    mission_header_lines = build_mission_header_comments(target_dir)
+    mission_header_lines = build_mission_header_comments(target_dir, mission_text=mission_md_content)
 
-    # Prepend mission to existing static main.py
+    # Prepend mission to the static main.py; only the packaged fallback needs a read-back.
     main_py = target_dir / "main.py"
-    if mission_header_lines and main_py.exists():
-        original_content = main_py.read_text()
-        already_injected = original_content.lstrip().startswith("# --- MISSION.md")
-        if not already_injected:
-            main_py.write_text("\n".join(mission_header_lines) + "\n\n" + original_content.lstrip("\n"))
+    if static_main_content is not None:
+        main_content: Optional[str] = fill_placeholders(static_main_content, replacements)
+    elif main_py.exists():
+        main_content = main_py.read_text()
+    else:
+        main_content = None
+    if main_content is not None:
+        # A BOM or leading blank lines must not hide an existing header (and cause a duplicate).
+        main_content = main_content.removeprefix("\ufeff")
+        if mission_header_lines and not MISSION_INJECTED_RE.match(main_content):
+            main_py.write_bytes(
+                ("\n".join(mission_header_lines) + "\n\n" + main_content.lstrip("\n")).encode("utf-8")
+            )
+        elif static_main_content is not None:
+            main_py.write_bytes(main_content.encode("utf-8"))
 
     # Write metadata for progression tracking
-    (target_dir / ".kata.json").write_text(json.dumps({
+    (target_dir / ".kata.json").write_bytes(dump_json({
         "pillar": pillar_hint or "mixed",
         "level": level_hint or "foundation",
         "template": resolved_template,
-        "created_at": datetime.now().isoformat()
-    }, indent=2))
+        "created_at": created_at.isoformat()
+    }))
 
     effective_tests_pref = tests_pref or ("edge" if prompt_user else "smoke")
     if effective_tests_pref != "skip":
         seed_test_scaffold(target_dir, resolved_template, idea_line, include_edge=(effective_tests_pref == "edge"))
 
     # Show Tree
+    from rich.tree import Tree
+
     tree = Tree(f"📂 [bold green]{target_dir.name}[/bold green]")
     tree.add("📜 MISSION.md")
     tree.add("🐍 main.py")
@@ -1908,11 +2216,12 @@ def handle_start(args: argparse.Namespace) -> int:
         if effective_tests_pref == "edge":
             tests_node.add("🐍 test_edge_cases.py")
     
+    invalidate_fs_caches()
     console.print(Panel(tree, title="Scaffold Generated", border_style="green"))
-    mission_preview_path = target_dir / "MISSION.md"
-    if mission_preview_path.exists():
+    # MISSION.md was just written from mission_md_content; preview from memory.
+    if mission_md_content:
         console.print("[bold]MISSION.md[/bold]")
-        type_out_text("\n".join(mission_preview_path.read_text().splitlines()[:10]))
+        type_out_text("\n".join(mission_md_content.splitlines()[:10]))
         console.print()
 
     console.print(f"Created kata at [green]{target_dir}[/green]")
@@ -1944,7 +2253,6 @@ def launch_session(project_dir: Path) -> None:
     Launch the editor and watch mode. Detects tmux for split-pane glory.
     """
     import subprocess
-    import os
     
     # Check for TMUX
     in_tmux = os.environ.get("TMUX") is not None
@@ -1964,15 +2272,38 @@ def launch_session(project_dir: Path) -> None:
         watch_cmd_str += "; rc=$?; echo \"[watch pane exited code ${rc}]\"; read -r _"
 
         # 1. Split window horizontally, cd to project, run dojo watch
-        split_result = subprocess.run([
+        split_cmd = [
             "tmux", "split-window", "-h", "-p", "30",
             "-c", str(project_dir), 
             watch_cmd_str
-        ], capture_output=True, text=True)
-        if split_result.returncode != 0:
+        ]
+        # posix_spawn skips subprocess's fork bookkeeping; tmux's stderr comes back over a pipe
+        # so a failed split is reported without running split-window a second time.
+        err_read, err_write = os.pipe()
+        try:
+            pid = os.posix_spawnp(
+                "tmux",
+                split_cmd,
+                os.environ,
+                file_actions=[(os.POSIX_SPAWN_DUP2, err_write, 2)],
+            )
+        except OSError as exc:
+            split_ok, split_err = False, str(exc)
+        else:
+            os.close(err_write)
+            err_write = -1
+            with os.fdopen(err_read, "rb") as err_pipe:
+                err_read = -1
+                split_err = err_pipe.read().decode("utf-8", errors="replace")
+            split_ok = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) == 0
+        finally:
+            for fd in (err_read, err_write):
+                if fd >= 0:
+                    os.close(fd)
+        if not split_ok:
             console.print("[red]Tmux split failed; watch pane not started.[/red]")
-            if split_result.stderr:
-                console.print(f"[dim]{summarize_failure_output(split_result.stderr)}[/dim]")
+            if split_err:
+                console.print(f"[dim]{summarize_failure_output(split_err)}[/dim]")
             console.print(f"[yellow]Run manually:[/yellow] {watch_cmd_str}")
         
         # 2. Open nvim in the current pane
@@ -1982,6 +2313,7 @@ def launch_session(project_dir: Path) -> None:
         # We need to change cwd for the nvim process
         os.chdir(project_dir)
         
+        invalidate_fs_caches()
         # Use execvp to replace the python process with nvim
         # We open MISSION.md (read-only reference) and main.py (to edit)
         os.execvp("nvim", ["nvim", "main.py", "MISSION.md"])
@@ -1990,31 +2322,35 @@ def launch_session(project_dir: Path) -> None:
         console.print("[yellow]Tip: Run 'dojo menu' inside tmux for auto-split 'Watch Mode'.[/yellow]")
         console.print("[dim]Launching Neovim...[/dim]")
         os.chdir(project_dir)
-        subprocess.run(["nvim", "main.py", "MISSION.md"])
-
-
-def set_default_main_py_content(target_dir: Path, template: str, idea_title: str, mission_content: str = "") -> None:
-    """
-    Sets a default main.py content with Mission Injection and Smart Imports.
-    """
-    main_py_path = target_dir / "main.py"
-    
-    # Smart Imports
-    imports = []
-    if "json" in mission_content.lower(): imports.append("import json")
-    if "csv" in mission_content.lower(): imports.append("import csv")
-    if "regex" in mission_content.lower() or "pattern" in mission_content.lower(): imports.append("import re")
-    if "file" in mission_content.lower() or "path" in mission_content.lower(): imports.append("from pathlib import Path")
-    if "async" in mission_content.lower(): imports.append("import asyncio")
-    if "env" in mission_content.lower(): imports.append("import os")
-    
-    import_block = "\n".join(imports)
-    
-    # Clean mission content for docstring (remove header to save space)
-    docstring_mission = "\n".join([line for line in mission_content.splitlines() if not line.startswith("# Mission")])
-
-    if template == "rag":
-        content = f'''"""RAG Kata: {idea_title}
+        try:
+            subprocess.run(["nvim", "main.py", "MISSION.md"])
+        finally:
+            # The editor session may have changed anything in the kata.
+            invalidate_fs_caches()
+
+
+# "# Mission..." title lines, dropped from the mission text embedded in main.py docstrings.
+MISSION_TITLE_LINE_RE = re.compile(r"^# Mission.*(?:\n|\Z)", re.MULTILINE)
+# Mission keywords that pull a stdlib import into the generated main.py.
+SMART_IMPORT_TRIGGERS = {
+    "json": "import json",
+    "csv": "import csv",
+    "regex": "import re",
+    "pattern": "import re",
+    "file": "from pathlib import Path",
+    "path": "from pathlib import Path",
+    "async": "import asyncio",
+    "env": "import os",
+}
+# Lookahead keeps overlapping keywords (e.g. "asyncsv") visible to a single finditer pass.
+SMART_IMPORT_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, SMART_IMPORT_TRIGGERS)) + "))", re.IGNORECASE
+)
+
+
+# Default main.py bodies for set_default_main_py_content, filled with str.format
+# (idea_title, docstring_mission, import_block); literal braces are doubled.
+RAG_MAIN_TEMPLATE = '''"""RAG Kata: {idea_title}
 
 MISSION SPECS:
 {docstring_mission}
@@ -2044,8 +2380,7 @@ def main():
 if __name__ == "__main__":
     main()
 '''
-    elif template == "mcp":
-        content = f'''"""MCP Server Kata: {idea_title}
+MCP_MAIN_TEMPLATE = '''"""MCP Server Kata: {idea_title}
 
 MISSION SPECS:
 {docstring_mission}
@@ -2086,8 +2421,7 @@ if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
 '''
-    else:
-        content = f'''"""Kata: {idea_title}
+SCRIPT_MAIN_TEMPLATE = '''"""Kata: {idea_title}
 
 MISSION SPECS:
 {docstring_mission}
@@ -2101,7 +2435,32 @@ def main():
 if __name__ == "__main__":
     main()
 '''
-    main_py_path.write_text(content)
+MAIN_PY_TEMPLATES = {"rag": RAG_MAIN_TEMPLATE, "mcp": MCP_MAIN_TEMPLATE}
+
+
+def set_default_main_py_content(target_dir: Path, template: str, idea_title: str, mission_content: str = "") -> None:
+    """
+    Sets a default main.py content with Mission Injection and Smart Imports.
+    """
+    main_py_path = target_dir / "main.py"
+    
+    # Smart Imports: one case-insensitive scan, emitted in trigger order.
+    found = {match.group(1).lower() for match in SMART_IMPORT_RE.finditer(mission_content)}
+    imports = list(dict.fromkeys(
+        statement for keyword, statement in SMART_IMPORT_TRIGGERS.items() if keyword in found
+    ))
+    
+    import_block = "\n".join(imports)
+    
+    # Clean mission content for docstring (remove header to save space)
+    docstring_mission = MISSION_TITLE_LINE_RE.sub("", mission_content).removesuffix("\n")
+
+    content = MAIN_PY_TEMPLATES.get(template, SCRIPT_MAIN_TEMPLATE).format(
+        idea_title=idea_title,
+        docstring_mission=docstring_mission,
+        import_block=import_block,
+    )
+    main_py_path.write_bytes(content.encode("utf-8"))
 
 
 def handle_play(args: argparse.Namespace) -> int:
@@ -2125,6 +2484,7 @@ def handle_play(args: argparse.Namespace) -> int:
     
     # Cleanup prompt after session ends
     if Confirm.ask("Delete this playground session?"):
+        import shutil
         shutil.rmtree(play_dir)
         console.print("Playground deleted.")
     
@@ -2141,22 +2501,30 @@ def handle_solve(args: argparse.Namespace) -> int:
     else:
         project_dir = Path.cwd()
 
-    if not (project_dir / "MISSION.md").exists():
+    # Read inputs before asking, so a broken kata fails fast instead of after the warning.
+    try:
+        mission = (project_dir / "MISSION.md").read_text()
+    except FileNotFoundError:
         console.print("[red]Not a valid kata directory (missing MISSION.md).[/red]")
         return 1
+    try:
+        current_code = (project_dir / "main.py").read_text()
+    except FileNotFoundError:
+        console.print("[red]Not a valid kata directory (missing main.py).[/red]")
+        return 1
 
     if not Confirm.ask("[bold red]WARNING:[/bold red] Using 'solve' forfeits XP for this kata. Continue?"):
         return 0
 
-    console.print("[yellow]Consulting the Archives...[/yellow]")
-    
-    mission = (project_dir / "MISSION.md").read_text()
-    current_code = (project_dir / "main.py").read_text()
-    
     system = "You are a Python Expert. Provide a complete, working solution for the given Mission. Output ONLY code."
     user = f"Mission:\n{mission}\n\nCurrent Stub:\n{current_code}\n\nProvide the full solution for main.py."
     
-    solution_code = call_idea_api(DEFAULT_IDEA_PROVIDER, DEFAULT_IDEA_MODEL, [{"role": "system", "content": system}, {"role": "user", "content": user}])
+    solution_code = generate_with_progress(
+        "Consulting the Archives",
+        DEFAULT_IDEA_PROVIDER,
+        DEFAULT_IDEA_MODEL,
+        [{"role": "system", "content": system}, {"role": "user", "content": user}],
+    )
     
     if solution_code:
         # Strip markdown fences if present
@@ -2167,9 +2535,10 @@ def handle_solve(args: argparse.Namespace) -> int:
         # Mark as cheated
         meta_path = project_dir / ".kata.json"
         if meta_path.exists():
-            meta = json.loads(meta_path.read_text())
+            meta = json.loads(meta_path.read_bytes())
             meta["cheated"] = True
-            meta_path.write_text(json.dumps(meta, indent=2))
+            meta_path.write_bytes(dump_json(meta))
+        invalidate_fs_caches()
     else:
         console.print("[red]Failed to generate solution.[/red]")
         
@@ -2187,14 +2556,18 @@ def handle_reset(args: argparse.Namespace) -> int:
         project_dir = Path.cwd()
 
     meta_path = project_dir / ".kata.json"
-    if not meta_path.exists():
+    try:
+        meta = json.loads(meta_path.read_bytes())
+    except FileNotFoundError:
         console.print("[red]Cannot reset: missing .kata.json metadata.[/red]")
         return 1
+    except json.JSONDecodeError:
+        console.print("[red]Cannot reset: unreadable .kata.json metadata.[/red]")
+        return 1
 
     if not Confirm.ask("Reset main.py to boilerplate? This deletes your code."):
         return 0
 
-    meta = json.loads(meta_path.read_text())
     template = meta.get("template", "script")
     
     # Re-read Mission for injection
@@ -2206,47 +2579,72 @@ def handle_reset(args: argparse.Namespace) -> int:
     readme = project_dir / "README.md"
     title = "Kata"
     if readme.exists():
-        title = readme.read_text().splitlines()[0].replace("#", "").strip()
+        title = first_header_line(readme) or title
 
     set_default_main_py_content(project_dir, template, title, mission_content)
+    invalidate_fs_caches()
     console.print("[green]Reset complete.[/green]")
     return 0
 
 
-def install_dependencies(project_dir: Path) -> None:
+# Requirements/marker stat signatures per kata already verified as installed this process.
+_DEPS_CURRENT: dict[Path, tuple[Any, Any]] = {}
+
+
+def requirements_digest(req_bytes: bytes) -> str:
     """
-    Check for requirements.txt and install missing dependencies.
+    Digest recorded in .deps_installed for the requirements it was installed from.
+    """
+    return hashlib.blake2b(req_bytes, digest_size=16).hexdigest()
+
+
+def deps_are_current(project_dir: Path) -> bool:
+    """
+    True when the kata needs no pip run: requirements.txt is missing or empty, or
+    .deps_installed holds its digest. Unchanged files are answered from stat alone.
     """
     req_path = project_dir / "requirements.txt"
-    if not req_path.exists():
-        return
+    marker = project_dir / ".deps_installed"
+    signature = (_stat_signature(req_path), _stat_signature(marker))
+    if _DEPS_CURRENT.get(project_dir) == signature:
+        return True
+    try:
+        req_bytes = req_path.read_bytes()
+    except FileNotFoundError:
+        req_bytes = b""
+    current = not req_bytes.strip()
+    if not current:
+        try:
+            current = marker.read_text().strip() == requirements_digest(req_bytes)
+        except (FileNotFoundError, UnicodeDecodeError):
+            current = False
+    if current:
+        _DEPS_CURRENT[project_dir] = signature
+    return current
 
-    # Check if packages are installed (lazy check via pip freeze? Too slow).
-    # Better: Just run pip install if user approves.
-    # To reduce friction: Check if we are in venv.
-    
-    # Simplified Logic:
-    # 1. Read requirements.
-    # 2. If non-empty, ask to install.
-    reqs = req_path.read_text().strip()
-    if not reqs:
-        return
 
-    # We only prompt if we suspect they aren't installed? 
-    # Or we just do it silently/quickly if we are in the 'dojo check' flow?
-    # Let's prompt ONCE per session ideally, but for now, prompt if missing.
-    # Actually, let's just use pip install -r ... it's fast if already satisfied.
-    
-    # Only run if we haven't checked recently? 
-    # Let's add a marker file .deps_installed to avoid constant pip calls
-    if (project_dir / ".deps_installed").exists():
-        # Check timestamp? Nah, simple is better.
+def install_dependencies(project_dir: Path) -> None:
+    """
+    Check for requirements.txt and install missing dependencies.
+    """
+    # .deps_installed records a digest of the requirements it was written for, so an
+    # edited requirements.txt triggers a reinstall while an unchanged one skips pip.
+    if deps_are_current(project_dir):
         return
+    req_path = project_dir / "requirements.txt"
+    marker = project_dir / ".deps_installed"
+    req_digest = requirements_digest(req_path.read_bytes())
+
+    import subprocess
 
     console.print("[yellow]Dependencies detected. Installing...[/yellow]")
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", str(req_path)], check=True, capture_output=True)
-        (project_dir / ".deps_installed").touch()
+        subprocess.run(
+            [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--quiet", "-r", str(req_path)],
+            check=True,
+            capture_output=True,
+        )
+        marker.write_text(req_digest)
         console.print("[green]Dependencies installed.[/green]")
     except subprocess.CalledProcessError as exc:
         console.print("[red]Failed to install dependencies.[/red]")
@@ -2269,15 +2667,19 @@ def handle_log(args: argparse.Namespace) -> int:
         print(f"Kata not found at {project_dir}", file=sys.stderr)
         return 1
 
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    timestamp = format_log_stamp(datetime.now())
     entry = f"- [{timestamp}] {args.note}\n"
 
+    # project_dir was checked above; each log gets exactly one write.
     project_log = project_dir / "LOG.md"
-    project_log.parent.mkdir(parents=True, exist_ok=True)
-    append_line(project_log, entry)
-
     central_log = notes_root / "log.md"
-    append_line(central_log, f"- [{timestamp}] {args.project}: {args.note}\n")
+    append_many(
+        [
+            (project_log, entry),
+            (central_log, f"- [{timestamp}] {args.project}: {args.note}\n"),
+        ]
+    )
+    invalidate_fs_caches()
 
     print(f"Logged entry to {project_log} and {central_log}")
     return 0
@@ -2293,6 +2695,7 @@ def handle_brief(args: argparse.Namespace) -> int:
     briefs_dir = notes_root / "briefs"
     briefs_dir.mkdir(parents=True, exist_ok=True)
 
+    now = datetime.now()
     if args.since:
         try:
             since_dt = datetime.strptime(args.since, "%Y-%m-%d")
@@ -2300,25 +2703,25 @@ def handle_brief(args: argparse.Namespace) -> int:
             print("Invalid --since format. Use YYYY-MM-DD.", file=sys.stderr)
             return 1
     else:
-        since_dt = datetime.now() - timedelta(days=7)
+        since_dt = now - timedelta(days=7)
 
     entries = collect_entries(kata_root, notes_root, since_dt)
     if not entries:
         print("No entries found for the requested window.")
         return 0
 
-    today_str = datetime.now().strftime("%Y-%m-%d")
+    today_str = now.strftime("%Y-%m-%d")
     brief_path = briefs_dir / f"{today_str}.md"
     content_lines = [
         f"# NexusDojo Brief ({today_str})",
         f"Since: {since_dt.strftime('%Y-%m-%d')}",
         "",
     ]
-    for project, ts, note in entries:
-        content_lines.append(f"- [{ts}] {project}: {note}")
+    content_lines.extend(f"- [{ts}] {project}: {note}" for project, ts, note in entries)
 
-    brief_path.write_text("\n".join(content_lines))
-    print(brief_path.read_text())
+    brief_text = "\n".join(content_lines)
+    brief_path.write_bytes(brief_text.encode("utf-8"))
+    print(brief_text)
     print(f"\nBrief saved to {brief_path}")
     return 0
 
@@ -2331,7 +2734,7 @@ def handle_calibrate(args: argparse.Namespace) -> int:
     notes_root.mkdir(parents=True, exist_ok=True)
     calibration_path = notes_root / "calibrations.md"
 
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    timestamp = format_log_stamp(datetime.now())
     entry = (
         f"- [{timestamp}] pillar={args.pillar} score={args.score}"
         f"{' note=' + args.note if args.note else ''}\n"
@@ -2352,8 +2755,11 @@ def handle_dashboard(args: argparse.Namespace) -> int:
     completed_drills = count_completed_drills(kata_root, notes_root)
     recent = latest_activity(kata_root, notes_root)
     calib_path = notes_root / "calibrations.md"
-    scores = parse_calibrations(calib_path) if calib_path.exists() else {}
-    trend = calibration_trend(calib_path) if calib_path.exists() else {}
+    try:
+        scores = parse_calibrations(calib_path)
+        trend = calibration_trend(calib_path)
+    except FileNotFoundError:
+        scores, trend = {}, {}
     weakest = weakest_pillar(scores)
     suggestion = fallback_idea(pillar_hint=weakest, level_hint="foundation", mode_hint=None)
     settings = load_settings(notes_root)
@@ -2441,24 +2847,24 @@ def handle_history(args: argparse.Namespace) -> int:
         set_current_profile_name(notes_root, name)
         save_settings(notes_root, {"user_name": name})
         console.print(f"[green]Profile '{name}' created and set active.[/green]")
-        Prompt.ask("\nPress Enter to return to menu")
+        wait_for_enter("\nPress Enter to return to menu")
     elif choice == "3":
         profiles = list_profiles(notes_root)
         if not profiles:
             console.print("[yellow]No profiles to switch to. Create one first.[/yellow]")
-            Prompt.ask("\nPress Enter to return to menu")
+            wait_for_enter("\nPress Enter to return to menu")
         else:
             target = Prompt.ask("Choose profile", choices=profiles, default=profiles[0])
             set_current_profile_name(notes_root, target)
             console.print(f"[green]Switched to profile '{target}'.[/green]")
-            Prompt.ask("\nPress Enter to return to menu")
+            wait_for_enter("\nPress Enter to return to menu")
     elif choice == "4":
         clear_current_profile(notes_root)
         console.print("[dim]Logged out. You'll be asked to choose a profile next time.[/dim]")
-        Prompt.ask("\nPress Enter to return to menu")
+        wait_for_enter("\nPress Enter to return to menu")
     else:
         # View only, already shown
-        Prompt.ask("\nPress Enter to return to menu")
+        wait_for_enter("\nPress Enter to return to menu")
     return 0
 
 
@@ -2476,10 +2882,8 @@ def handle_continue(args: argparse.Namespace) -> int:
     project, ts, note = recent
     project_dir = kata_root / project
     readme = project_dir / "README.md"
-    if readme.exists():
-        lines = readme.read_text().splitlines()
-        brief = lines[0] if lines else "README is empty."
-        brief = brief.lstrip("# ").strip() or brief
+    if cached_exists(readme):
+        brief = first_header_line(readme) or "README is empty."
     else:
         brief = "README not found yet."
     print("Resume kata")
@@ -2489,11 +2893,11 @@ def handle_continue(args: argparse.Namespace) -> int:
     print(f"- Brief: {brief}")
     log_hint = project_dir / "LOG.md"
     print(f"- Next: open code, run tests (`python -m unittest`), then `dojo log {project} --note \"...\"`.")
-    if log_hint.exists():
+    if cached_exists(log_hint):
         last_log = last_lines(log_hint, 3)
         if last_log:
             print(f"- Recent log lines:\n{last_log}")
-    if interactive and project_dir.exists():
+    if interactive and cached_exists(project_dir):
         console.print("[dim]Launching editor + watch...[/dim]")
         launch_session(project_dir)
     return 0
@@ -2506,11 +2910,11 @@ def handle_transcript(args: argparse.Namespace) -> int:
     notes_root = Path(args.notes_root).expanduser()
     notes_root.mkdir(parents=True, exist_ok=True)
     transcript_path = notes_root / "transcript.md"
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    lines = [f"- [{timestamp}] {args.text}"]
+    timestamp = format_log_stamp(datetime.now())
+    lines = [f"- [{timestamp}] {args.text}\n"]
     if args.summarize:
-        lines.append(f"  Summary: {summarize_text(args.text)}")
-    append_line(transcript_path, "\n".join(lines) + "\n")
+        lines.append(f"  Summary: {summarize_text(args.text)}\n")
+    append_lines(transcript_path, lines)
     print(f"Transcript updated: {transcript_path}")
     return 0
 
@@ -2557,7 +2961,8 @@ def handle_hint(args: argparse.Namespace) -> int:
     if args.offline or fallback_used:
         label += " [offline fallback]"
     quota_line = f"(remaining today: {remaining})" if remaining is not None else ""
-    
+    from rich.markdown import Markdown
+
     console.print(Panel(
         Markdown(hint),
         title=f"💡 {label} {quota_line}",
@@ -2609,37 +3014,118 @@ def handle_test_hints(args: argparse.Namespace) -> int:
     return 0
 
 
-def get_streak_heatmap(notes_root: Path, days: int = 7) -> str:
+def _stat_signature(path: Path) -> Optional[tuple[int, int]]:
     """
-    Generate a simple ASCII heatmap of recent activity.
+    (mtime_ns, size) for a path, or None if it does not exist.
     """
-    log_path = notes_root / "log.md"
-    active_dates = set()
-    if log_path.exists():
-        for line in log_path.read_text().splitlines():
-            # Minimal parsing for speed
-            if line.startswith("- ["):
-                try:
-                    date_str = line[3:13] # YYYY-MM-DD
-                    active_dates.add(date_str)
-                except: pass
-    
-    heatmap = []
-    today = datetime.now().date()
-    for i in range(days - 1, -1, -1):
-        d = today - timedelta(days=i)
-        d_str = d.strftime("%Y-%m-%d")
-        if d_str in active_dates:
-            heatmap.append("[green]■[/green]")
-        else:
-            heatmap.append("[dim]□[/dim]")
-            
-    return " ".join(heatmap)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
-def find_active_kata_dir(cwd: Path) -> Optional[Path]:
+def mtime_cached(validators: Callable[..., Iterable[Any]], maxsize: int = 16) -> Callable:
     """
-    Check if cwd or parents is a kata directory (has .kata.json or MISSION.md).
+    Memoize a function until the files it reads change.
+    validators(*args, **kwargs) returns the inputs to watch: Paths are compared by
+    (mtime_ns, size), anything else by value (e.g. today's date).
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: dict[Any, tuple[tuple[Any, ...], Any]] = {}
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            signature = tuple(
+                _stat_signature(item) if isinstance(item, Path) else item
+                for item in validators(*args, **kwargs)
+            )
+            hit = cache.get(key)
+            if hit is not None and hit[0] == signature:
+                return hit[1]
+            result = func(*args, **kwargs)
+            cache.pop(key, None)
+            cache[key] = (signature, result)
+            if len(cache) > maxsize:
+                cache.pop(next(iter(cache)), None)
+            return result
+
+        wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+# Heatmap cells for a day with and without a log entry.
+HEATMAP_ACTIVE = "[green]■[/green]"
+HEATMAP_INACTIVE = "[dim]□[/dim]"
+
+
+@mtime_cached(lambda notes_root, days=7: (notes_root / "log.md", datetime.now().date()))
+def get_streak_heatmap(notes_root: Path, days: int = 7) -> str:
+    """
+    Generate a simple ASCII heatmap of recent activity.
+    """
+    log_path = notes_root / "log.md"
+    today = datetime.now().date()
+    day_keys = [
+        (today - timedelta(days=i)).strftime("%Y-%m-%d").encode("ascii")
+        for i in range(days - 1, -1, -1)
+    ]
+    pending = set(day_keys)
+    active_dates: set[bytes] = set()
+    # Stream raw bytes: only the "- [YYYY-MM-DD" prefix matters, so note text is never
+    # decoded, and the scan stops once every day in the window has been seen.
+    try:
+        with log_path.open("rb") as handle:
+            for line in handle:
+                if line.startswith(LOG_ENTRY_PREFIX_BYTES):
+                    date_key = line[3:13]
+                    if date_key in pending:
+                        pending.discard(date_key)
+                        active_dates.add(date_key)
+                        if not pending:
+                            break
+    except FileNotFoundError:
+        pass
+
+    return " ".join(HEATMAP_ACTIVE if d_key in active_dates else HEATMAP_INACTIVE for d_key in day_keys)
+
+
+# Short-lived (checked_at, exists, mtime_ns) records for the well-known kata files
+# (README/MISSION/LOG/.kata.json/tests) probed on every menu redraw.
+STAT_CACHE_TTL_SECONDS = 1.0
+_STAT_CACHE: dict[str, tuple[float, bool, int]] = {}
+
+
+def cached_exists(path: Path, ttl: float = STAT_CACHE_TTL_SECONDS) -> bool:
+    """
+    Path.exists() that re-stats a given path at most once per ttl seconds.
+    """
+    key = os.fspath(path)
+    now = time.monotonic()
+    hit = _STAT_CACHE.get(key)
+    if hit is not None and now - hit[0] <= ttl:
+        return hit[1]
+    try:
+        record = (now, True, os.stat(key).st_mtime_ns)
+    except OSError:
+        record = (now, False, 0)
+    _STAT_CACHE[key] = record
+    return record[1]
+
+
+def invalidate_fs_caches() -> None:
+    """
+    Drop cached filesystem probes; call after anything creates, edits or removes kata files.
+    """
+    _STAT_CACHE.clear()
+
+
+def find_active_kata_dir(cwd: Path) -> Optional[Path]:
+    """
+    Check if cwd or parents is a kata directory (has .kata.json or MISSION.md).
     """
     # Check current first
     if (cwd / ".kata.json").exists() or (cwd / "MISSION.md").exists():
@@ -2653,127 +3139,6 @@ def find_active_kata_dir(cwd: Path) -> Optional[Path]:
              return parent / cwd.name
     return None
 
-def format_pillar_label(pillar: str) -> str:
-    """
-    Normalize pillar labels for display (e.g., CLI, API).
-    """
-    p = pillar.lower()
-    if p == "cli":
-        return "CLI"
-    elif p == "api":
-        return "API"
-    elif p == "python":
-        return "Python"
-    elif p == "testing":
-        return "Testing"
-    elif p == "mixed":
-        return "Mixed"
-    return pillar.title()
-
-def count_completed_drills(kata_root: Path, notes_root: Path) -> int:
-    # Estimate based on unique projects in log or folders in dojo
-    # Log is better for completed
-    entries = collect_entries(kata_root, notes_root, datetime.min)
-    unique_projects = {e[0] for e in entries}
-    return len(unique_projects)
-
-def resolve_last_kata(kata_root: Path, notes_root: Path) -> tuple[Optional[str], Optional[Path]]:
-    recent = latest_activity(kata_root, notes_root)
-    if not recent:
-        # Fallback to finding newest directory in kata_root
-        newest_project: Optional[str] = None
-        newest_path: Optional[Path] = None
-        newest_ts: Optional[datetime] = None
-        if kata_root.exists():
-            for project_dir in kata_root.iterdir():
-                if not project_dir.is_dir():
-                    continue
-                meta_ts: Optional[datetime] = None
-                meta_path = project_dir / ".kata.json"
-                if meta_path.exists():
-                    try:
-                        meta = json.loads(meta_path.read_text())
-                        meta_ts = datetime.fromisoformat(meta.get("created_at", ""))
-                    except Exception:
-                        meta_ts = None
-                if meta_ts is None:
-                    meta_ts = datetime.fromtimestamp(project_dir.stat().st_mtime)
-                if newest_ts is None or meta_ts > newest_ts:
-                    newest_ts = meta_ts
-                    newest_project = project_dir.name
-                    newest_path = project_dir
-        return newest_project, newest_path
-    project = recent[0]
-    target_dir = kata_root / project
-    return project, target_dir if target_dir.exists() else None
-
-def peek_kata_summary(kata_dir: Path, notes_root: Path) -> None:
-    # 1. File Tree
-    tree = Tree(f"📂 [bold cyan]{kata_dir.name}[/bold cyan]")
-    for path in sorted(kata_dir.rglob("*")):
-        if path.name.startswith("."): continue
-        if path.is_dir():
-            # Simply showing top level structure for clarity
-            continue 
-        
-        # relative path
-        rel = path.relative_to(kata_dir)
-        # Add to tree (simplified flat add for now, or recursive if we want)
-        # Let's keep it simple: just show direct children and tests
-        if len(rel.parts) > 2: continue # Don't go too deep
-        
-        icon = "📄"
-        if path.suffix == ".py": icon = "🐍"
-        if path.name == "MISSION.md": icon = "📜"
-        if path.name == "README.md": icon = "📖"
-        
-        tree.add(f"{icon} {rel}")
-
-    # 2. Content Preview
-    readme = kata_dir / "README.md"
-    mission = kata_dir / "MISSION.md"
-    
-    content_render = None
-    if mission.exists():
-        content_render = Markdown(mission.read_text())
-        title = "MISSION.md"
-    elif readme.exists():
-        content_render = Markdown(readme.read_text())
-        title = "README.md"
-    else:
-        content_render = Text("No documentation found.", style="italic dim")
-        title = "Info"
-
-    # Layout
-    console.print(Panel(tree, title="Architecture", border_style="blue"))
-    console.print(Panel(content_render, title=f"Preview: {title}", border_style="cyan"))
-
-def quick_check_preview(kata_dir: Path, notes_root: Path) -> tuple[bool, str]:
-    import subprocess
-    if not (kata_dir / "tests").exists():
-        return False, "No tests found."
-    
-    try:
-        # Run tests silently
-        result = subprocess.run(
-            [sys.executable, "-m", "unittest"],
-            cwd=kata_dir,
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            return True, "All tests passed."
-        else:
-            # Count failures
-            count = result.stderr.count("FAIL") + result.stderr.count("ERROR")
-            return False, f"Tests failed ({count} errors/failures)."
-    except subprocess.TimeoutExpired:
-        return False, "Tests timed out."
-    except Exception as e:
-        return False, f"Error running tests: {e}"
-
-
 
 def render_progress_bar(current: int, total: int, width: int = 20) -> str:
     """
@@ -2793,13 +3158,11 @@ def render_progress_bar(current: int, total: int, width: int = 20) -> str:
     bar = f"[{color}]{'━' * filled}[/{color}]{'[dim]━[/dim]' * empty}"
     return bar
 
+@functools.lru_cache(maxsize=512)
 def get_next_level_threshold(xp: int) -> int:
     # Matches get_level_info logic
-    if xp < 100: return 100
-    if xp < 300: return 300
-    if xp < 600: return 600
-    if xp < 1000: return 1000
-    return 9999
+    idx = bisect.bisect_right(LEVEL_THRESHOLDS, xp)
+    return LEVEL_THRESHOLDS[idx] if idx < len(LEVEL_THRESHOLDS) else 9999
 
 
 def type_out_text(text: str, delay: float = 0.01) -> None:
@@ -2812,37 +3175,45 @@ def type_out_text(text: str, delay: float = 0.01) -> None:
         time.sleep(pause)
 
 
+# Faint debug lines streamed by start_matrix_rain, pre-wrapped in their dim markup.
+MATRIX_RAIN_TEMPLATES = (
+    "[dim]> [DEBUG] weakest='{pillar}' variance={var:.2f}[/dim]",
+    "[dim]> [TRACE] template='{mode}' noise={noise:.2f}[/dim]",
+    "[dim]> [DEBUG] scoring rubric: fluency={score:.2f}[/dim]",
+    "[dim]> [SYS] hint_sampler={hint:.2f} beam={beam}[/dim]",
+    "[dim]> [DEBUG] mission synth pass={pass_no}[/dim]",
+    "[dim]> [ANALYZE] context tokens={tokens}[/dim]",
+)
+MATRIX_RAIN_MAX_LINES = 18
+
+
 def start_matrix_rain(pillar: str, mode: str, duration: float = 1.6) -> tuple[threading.Event, threading.Thread]:
     """
     Stream faint debug-style lines while an AI task runs.
     """
     stop_event = threading.Event()
-    debug_templates = [
-        "> [DEBUG] weakest='{pillar}' variance={var:.2f}",
-        "> [TRACE] template='{mode}' noise={noise:.2f}",
-        "> [DEBUG] scoring rubric: fluency={score:.2f}",
-        "> [SYS] hint_sampler={hint:.2f} beam={beam}",
-        "> [DEBUG] mission synth pass={pass_no}",
-        "> [ANALYZE] context tokens={tokens}",
-    ]
     def worker() -> None:
-        start_time = time.time()
-        lines = 0
-        while not stop_event.is_set() and time.time() - start_time < duration and lines < 18:
-            template = random.choice(debug_templates)
-            line = template.format(
+        # Draw every line up front so each tick is just a print and a sleep.
+        rng = random.random
+        lines = [
+            template.format(
                 pillar=pillar,
                 mode=mode,
-                var=random.random(),
-                noise=random.random(),
-                score=random.uniform(0.2, 0.95),
-                hint=random.uniform(0.1, 0.9),
+                var=rng(),
+                noise=rng(),
+                score=0.2 + 0.75 * rng(),
+                hint=0.1 + 0.8 * rng(),
                 beam=random.randint(2, 6),
                 pass_no=random.randint(1, 3),
                 tokens=random.randint(240, 1480),
             )
-            console.print(f"[dim]{line}[/dim]")
-            lines += 1
+            for template in random.choices(MATRIX_RAIN_TEMPLATES, k=MATRIX_RAIN_MAX_LINES)
+        ]
+        deadline = time.time() + duration
+        for line in lines:
+            if stop_event.is_set() or time.time() >= deadline:
+                break
+            console.print(line)
             time.sleep(0.12)
     thread = threading.Thread(target=worker, daemon=True)
     thread.start()
@@ -2894,7 +3265,7 @@ def print_splash():
     console.clear()
     console.print(Align.center(banner))
     console.print(Align.center("[dim]Initializing System...[/dim]"))
-    time.sleep(1.0) # The "Premium" pause
+    interruptible_pause(1.0) # The "Premium" pause
 def handle_menu(args: argparse.Namespace) -> int:
     """
     Interactive menu for common tasks (Rich UI - Dashboard).
@@ -2928,7 +3299,6 @@ def handle_menu(args: argparse.Namespace) -> int:
     entrance_played = False
 
     while True:
-        import time
         try:
             console.clear()
 
@@ -2952,7 +3322,7 @@ def handle_menu(args: argparse.Namespace) -> int:
             # active_kata_dir = find_active_kata_dir(Path.cwd()) # This might not exist in your version yet
             # Let assume we are in lobby unless specified
             active_kata_dir = None
-            if (Path.cwd() / "MISSION.md").exists():
+            if cached_exists(Path.cwd() / "MISSION.md"):
                  active_kata_dir = Path.cwd()
             
             in_kata_context = active_kata_dir is not None and not force_lobby_view
@@ -3035,12 +3405,27 @@ def handle_menu(args: argparse.Namespace) -> int:
             ]
             session_mantra = mantras[dt.now().minute % len(mantras)]
 
-            def build_menu(selected_idx: int) -> Group:
-                """Two-column HEADER (status | memory) + single-column MENU below, stretched."""
+            # Everything except the highlighted row is fixed for this pass through the menu,
+            # so header blocks are built once per terminal width and menu rows once per pass.
+            menu_label_width = max(len(item["label"]) for item in menu_items) + 2
+            menu_rows = []
+            for item in menu_items:
+                label = item["label"].ljust(menu_label_width)
+                desc = item["desc"]
+                selected_row = f"[cyan]›[/cyan] [bold white]{label}[/bold white]"
+                if desc:
+                    selected_row += f"  [dim]{desc}[/dim]"
+                    idle_row = f"  [dim]{label}  {desc}[/dim]"
+                else:
+                    idle_row = f"  [dim]{label}[/dim]"
+                menu_rows.append((Text.from_markup(idle_row), Text.from_markup(selected_row)))
+            header_blocks: dict[int, tuple] = {}
 
-                # ═══ CONTENT WIDTH ═══
-                terminal_width = console.width
-                content_width = max(60, terminal_width - 4)
+            def build_header(content_width: int) -> tuple:
+                """Header grid plus the static rows around the menu for one content width."""
+                blocks = header_blocks.get(content_width)
+                if blocks is not None:
+                    return blocks
 
                 # ═══ HEADER LEFT: Status / Skills ═══
                 h_left = Table.grid(padding=0)
@@ -3089,42 +3474,44 @@ def handle_menu(args: argparse.Namespace) -> int:
                 header.add_column(width=right_width)
                 header.add_row(h_left, h_right)
 
+                blocks = (
+                    header,
+                    Align.center(Text.from_markup(f"[italic]{session_mantra}[/italic]"), width=content_width),
+                    Text.from_markup(f"[grey30]{'-' * content_width}[/grey30]"),
+                    Align.center(Text.from_markup("[grey37]↑↓ select · enter confirm · q quit[/grey37]"), width=content_width),
+                )
+                header_blocks[content_width] = blocks
+                return blocks
+
+            def build_menu(selected_idx: int) -> Group:
+                """Two-column HEADER (status | memory) + single-column MENU below, stretched."""
+
+                # ═══ CONTENT WIDTH ═══
+                terminal_width = console.width
+                content_width = max(60, terminal_width - 4)
+                header, mantra_row, separator_row, hint_row = build_header(content_width)
+
                 # ═══ MENU (single column) ═══
                 menu_grid = Table.grid(padding=0)
                 menu_grid.add_column(width=content_width)
 
-                menu_label_width = max(len(item["label"]) for item in menu_items) + 2
-
-                for i, item in enumerate(menu_items):
+                for i, (idle_row, selected_row) in enumerate(menu_rows):
                     if i == divider_after:
                         menu_grid.add_row("")
-                    is_selected = (i == selected_idx)
-                    label = item["label"].ljust(menu_label_width)
-                    desc = item["desc"]
-                    if is_selected:
-                        desc_markup = f"[dim]{desc}[/dim]" if desc else ""
-                        row = f"[cyan]›[/cyan] [bold white]{label}[/bold white]"
-                        if desc_markup:
-                            row += f"  {desc_markup}"
-                    else:
-                        if desc:
-                            row = f"  [dim]{label}  {desc}[/dim]"
-                        else:
-                            row = f"  [dim]{label}[/dim]"
-                    menu_grid.add_row(Text.from_markup(row))
+                    menu_grid.add_row(selected_row if i == selected_idx else idle_row)
 
                 # ═══ CONTENT CONTAINER (centered) ═══
                 content = Table.grid(padding=0)
                 content.add_column(width=content_width)
                 content.add_row(header)
                 content.add_row("")
-                content.add_row(Align.center(Text.from_markup(f"[italic]{session_mantra}[/italic]"), width=content_width))
+                content.add_row(mantra_row)
                 content.add_row("")
-                content.add_row(Text.from_markup(f"[grey30]{'-' * content_width}[/grey30]"))
+                content.add_row(separator_row)
                 content.add_row("")
                 content.add_row(menu_grid)
                 content.add_row("")
-                content.add_row(Align.center(Text.from_markup("[grey37]↑↓ select · enter confirm · q quit[/grey37]"), width=content_width))
+                content.add_row(hint_row)
 
                 # ═══ ASSEMBLE ═══
                 lines = []
@@ -3190,11 +3577,10 @@ def handle_menu(args: argparse.Namespace) -> int:
                     while True:
                         console.clear()
                         console.print(f"\n[bold]{title}[/bold]\n")
-                        for i, opt in enumerate(options):
-                            if i == sel:
-                                console.print(Text.from_markup(f"[cyan]›[/cyan] [bold white]{opt}[/bold white]"))
-                            else:
-                                console.print(Text.from_markup(f"  [dim]{opt}[/dim]"))
+                        console.print(Text.from_markup("\n".join(
+                            f"[cyan]›[/cyan] [bold white]{opt}[/bold white]" if i == sel else f"  [dim]{opt}[/dim]"
+                            for i, opt in enumerate(options)
+                        )))
                         console.print("\n[grey37]↑↓ select · enter confirm · q back[/grey37]")
                         key = read_key()
                         if key == "UP":
@@ -3232,7 +3618,7 @@ def handle_menu(args: argparse.Namespace) -> int:
                     entries = level_map.get(level_num, [])
                     if not entries:
                         console.print(f"[yellow]No katas mapped for {title} yet.[/yellow]")
-                        time.sleep(1)
+                        interruptible_pause(1)
                         return False
                     completed_entries = collect_entries(kata_root, notes_root, datetime.min)
                     completed_slugs = {e[0] for e in completed_entries}
@@ -3251,7 +3637,7 @@ def handle_menu(args: argparse.Namespace) -> int:
                     project_dir = kata_root / kata_slug
                     if not project_dir.exists():
                         console.print(f"[bold red]Missing kata:[/bold red] {project_dir}")
-                        Prompt.ask("Press Enter to return")
+                        wait_for_enter("Press Enter to return")
                         return False
                     launch_session(project_dir)
                     return True
@@ -3263,7 +3649,7 @@ def handle_menu(args: argparse.Namespace) -> int:
                         break
                     if gym_sel == 0:
                         console.print("[yellow]Quick Train is coming soon (LLM kata generation still being wired up).[/yellow]")
-                        time.sleep(1.2)
+                        interruptible_pause(1.2)
                         continue
                     if gym_sel == 1:
                         if select_from_level(1, "Level 1 Katas"):
@@ -3302,7 +3688,7 @@ def handle_menu(args: argparse.Namespace) -> int:
                         project_dir = kata_root / chosen["slug"]
                         if not project_dir.exists():
                             console.print(f"[bold red]Missing kata:[/bold red] {project_dir}")
-                            Prompt.ask("Press Enter to return")
+                            wait_for_enter("Press Enter to return")
                             continue
                         launch_session(project_dir)
                         return 0
@@ -3322,7 +3708,7 @@ def handle_menu(args: argparse.Namespace) -> int:
                         project_dir = kata_root / selected["slug"]
                         if not project_dir.exists():
                             console.print(f"[bold red]Missing kata:[/bold red] {project_dir}")
-                            Prompt.ask("Press Enter to return")
+                            wait_for_enter("Press Enter to return")
                             continue
                         launch_session(project_dir)
                         return 0
@@ -3331,15 +3717,15 @@ def handle_menu(args: argparse.Namespace) -> int:
 
             elif choice == "2":
                 console.print("[yellow]Workshop under construction.[/yellow]")
-                time.sleep(1)
+                interruptible_pause(1)
             elif choice == "3":
                 console.print("[red]Not ready for Boss Battle.[/red]")
-                time.sleep(1)
+                interruptible_pause(1)
             elif choice == "4":
                 return handle_continue(args)
             elif choice == "5":
                 handle_info(args)
-                Prompt.ask("Press Enter to return")
+                wait_for_enter("Press Enter to return")
             elif choice == "6":
                 handle_settings(args)
             elif choice == "7":
@@ -3353,7 +3739,7 @@ def handle_menu(args: argparse.Namespace) -> int:
             console.print(f"[bold red]CRITICAL MENU ERROR: {e}[/bold red]")
             import traceback
             console.print(traceback.format_exc())
-            Prompt.ask("Press Enter to retry...")
+            wait_for_enter("Press Enter to retry...")
             continue
 
 
@@ -3410,8 +3796,26 @@ def append_line(path: Path, line: str) -> None:
     """
     Append a line to a file, creating the file if needed.
     """
+    append_lines(path, (line,))
+
+
+def append_lines(path: Path, lines: Iterable[str]) -> None:
+    """
+    Append newline-terminated lines with one open and a single write.
+    """
     with path.open("a", encoding="utf-8") as handle:
-        handle.write(line)
+        handle.write("".join(lines))
+
+
+def append_many(entries: Iterable[tuple[Path, str]]) -> None:
+    """
+    Append lines to several files, opening and writing each distinct file once.
+    """
+    grouped: dict[Path, list[str]] = {}
+    for path, line in entries:
+        grouped.setdefault(path, []).append(line)
+    for path, lines in grouped.items():
+        append_lines(path, lines)
 
 
 def get_profiles_dir(notes_root: Path) -> Path:
@@ -3421,16 +3825,13 @@ def get_profiles_dir(notes_root: Path) -> Path:
 
 
 def get_current_profile_name(notes_root: Path) -> Optional[str]:
-    pointer = notes_root / ".current_profile"
-    if pointer.exists():
-        name = pointer.read_text().strip()
-        return name or None
-    return None
+    name = read_or_empty(notes_root / ".current_profile").strip()
+    return name or None
 
 
 def set_current_profile_name(notes_root: Path, name: str) -> None:
     notes_root.mkdir(parents=True, exist_ok=True)
-    (notes_root / ".current_profile").write_text(name.strip())
+    (notes_root / ".current_profile").write_bytes(name.strip().encode("utf-8"))
 
 
 def clear_current_profile(notes_root: Path) -> None:
@@ -3441,7 +3842,16 @@ def clear_current_profile(notes_root: Path) -> None:
 
 def list_profiles(notes_root: Path) -> list[str]:
     profiles_dir = get_profiles_dir(notes_root)
-    return sorted(p.stem for p in profiles_dir.glob("*.json") if p.is_file())
+    try:
+        with os.scandir(profiles_dir) as entries:
+            # Like glob("*.json"): dot-files are skipped.
+            return sorted(
+                entry.name[:-5]
+                for entry in entries
+                if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file()
+            )
+    except OSError:
+        return []
 
 
 def load_settings(notes_root: Path) -> dict[str, str]:
@@ -3451,25 +3861,24 @@ def load_settings(notes_root: Path) -> dict[str, str]:
     profiles_dir = get_profiles_dir(notes_root)
     current = get_current_profile_name(notes_root)
     if current:
-        profile_path = profiles_dir / f"{current}.json"
-        if profile_path.exists():
-            try:
-                return json.loads(profile_path.read_text())
-            except json.JSONDecodeError:
-                return {}
-    # Legacy fallback
-    settings_path = notes_root / "dojo_settings.json"
-    if settings_path.exists():
         try:
-            data = json.loads(settings_path.read_text())
+            return json.loads((profiles_dir / f"{current}.json").read_bytes())
+        except FileNotFoundError:
+            pass
         except json.JSONDecodeError:
             return {}
-        # Promote legacy settings into a default profile
-        current = current or "default"
-        set_current_profile_name(notes_root, current)
-        save_settings(notes_root, data)
-        return data
-    return {}
+    # Legacy fallback
+    try:
+        data = json.loads((notes_root / "dojo_settings.json").read_bytes())
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        return {}
+    # Promote legacy settings into a default profile
+    current = current or "default"
+    set_current_profile_name(notes_root, current)
+    save_settings(notes_root, data)
+    return data
 
 
 def save_settings(notes_root: Path, settings: dict[str, str]) -> None:
@@ -3482,10 +3891,10 @@ def save_settings(notes_root: Path, settings: dict[str, str]) -> None:
         current = "default"
         set_current_profile_name(notes_root, current)
     profile_path = profiles_dir / f"{current}.json"
-    profile_path.write_text(json.dumps(settings, indent=2))
-    # Legacy mirror for compatibility
-    legacy_path = notes_root / "dojo_settings.json"
-    legacy_path.write_text(json.dumps(settings, indent=2))
+    data = dump_json(settings)
+    write_atomic(profile_path, data)
+    # Legacy mirror for compatibility: a plain copy of the same bytes, independent of the profile.
+    (notes_root / "dojo_settings.json").write_bytes(data)
 
 
 def prompt_choice(prompt: str, default: str, allowed: set[str]) -> str:
@@ -3505,8 +3914,12 @@ def prompt_choice(prompt: str, default: str, allowed: set[str]) -> str:
         )
 
 
+# Characters dropped from profile names (profile names double as file names).
+PROFILE_NAME_STRIP_RE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
 def sanitize_profile_name(name: str) -> str:
-    return re.sub(r"[^A-Za-z0-9_-]+", "", name).strip()
+    return PROFILE_NAME_STRIP_RE.sub("", name).strip()
 
 
 def show_login_page(notes_root: Path) -> str:
@@ -3548,16 +3961,16 @@ def show_login_page(notes_root: Path) -> str:
         set_current_profile_name(notes_root, name)
         save_settings(notes_root, {"user_name": name, "remember_user": False})
         console.print(f"\n[green]✓ Profile '{name}' created![/green]")
-        import time
-        time.sleep(1)
+        interruptible_pause(1)
         return name
 
     # Existing profiles
     console.print("[bold]Your Profiles:[/bold]\n")
-    for idx, prof in enumerate(existing, 1):
-        console.print(f"  [bold cyan]{idx}[/bold cyan] {prof}")
-    console.print(f"  [bold cyan]{len(existing) + 1}[/bold cyan] [dim]Create new profile[/dim]")
-    console.print()
+    console.print("\n".join([
+        *(f"  [bold cyan]{idx}[/bold cyan] {prof}" for idx, prof in enumerate(existing, 1)),
+        f"  [bold cyan]{len(existing) + 1}[/bold cyan] [dim]Create new profile[/dim]",
+        "",
+    ]))
 
     max_choice = len(existing) + 1
     choice = Prompt.ask(
@@ -3577,16 +3990,14 @@ def show_login_page(notes_root: Path) -> str:
         set_current_profile_name(notes_root, name)
         save_settings(notes_root, {"user_name": name, "remember_user": False})
         console.print(f"\n[green]✓ Profile '{name}' created![/green]")
-        import time
-        time.sleep(1)
+        interruptible_pause(1)
         return name
     else:
         # Use existing
         target = existing[choice_num - 1]
         set_current_profile_name(notes_root, target)
         console.print(f"\n[green]✓ Logged in as {target}[/green]")
-        import time
-        time.sleep(0.5)
+        interruptible_pause(0.5)
         return target
 
 
@@ -3604,47 +4015,81 @@ def ensure_profile_selected(notes_root: Path) -> str:
     return show_login_page(notes_root)
 
 
-def collect_entries(kata_root: Path, notes_root: Path, since: datetime) -> list[tuple[str, str, str]]:
+def iter_entries(kata_root: Path, notes_root: Path, since: datetime) -> Iterable[tuple[str, str, str]]:
     """
-    Collect log entries from kata logs and central log since a cutoff.
+    Yield raw log entries from the central log and every kata log since a cutoff,
+    unsorted and possibly duplicated.
     """
-    entries: list[tuple[str, str, str]] = []
-
+    # Entries are stamped when they are appended, so a log last written before the cutoff
+    # holds nothing newer and is skipped without being opened.
+    try:
+        cutoff = since.timestamp()
+    except (ValueError, OverflowError, OSError):
+        # datetime.min and friends have no epoch timestamp; nothing predates them anyway.
+        cutoff = float("-inf")
     central_log = notes_root / "log.md"
-    if central_log.exists():
-        entries.extend(parse_log_file(central_log, default_project="central", since=since))
+    try:
+        if central_log.stat().st_mtime >= cutoff:
+            yield from parse_log_file(central_log, default_project="central", since=since)
+    except OSError:
+        pass
 
-    if kata_root.exists():
-        for project_dir in kata_root.iterdir():
-            if project_dir.is_dir():
-                project_log = project_dir / "LOG.md"
-                if project_log.exists():
-                    entries.extend(parse_log_file(project_log, default_project=project_dir.name, since=since))
-
-    # Sort chronologically
-    entries.sort(key=lambda item: item[1])
-    deduped: list[tuple[str, str, str]] = []
-    seen: set[tuple[str, str, str]] = set()
-    for entry in entries:
-        if entry not in seen:
-            deduped.append(entry)
-            seen.add(entry)
-    return deduped
+    project_logs = []
+    try:
+        with os.scandir(kata_root) as it:
+            # DirEntry.is_dir() uses the type from the directory listing, so only LOG.md is stat'ed.
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                log_path = os.path.join(entry.path, "LOG.md")
+                try:
+                    if os.stat(log_path).st_mtime < cutoff:
+                        continue
+                except OSError:
+                    continue
+                project_logs.append((entry.name, Path(log_path)))
+    except FileNotFoundError:
+        return
+    for project, project_log in project_logs:
+        yield from parse_log_file(project_log, default_project=project, since=since)
+
+
+def collect_entries(kata_root: Path, notes_root: Path, since: datetime) -> list[tuple[str, str, str]]:
+    """
+    Collect log entries from kata logs and central log since a cutoff.
+    """
+    # Sort chronologically, then drop repeats keeping first occurrences (dicts keep insertion order).
+    entries = sorted(iter_entries(kata_root, notes_root, since), key=lambda item: item[1])
+    return list(dict.fromkeys(entries))
 
 
 def count_completed_drills(kata_root: Path, notes_root: Path) -> int:
     """
-    Count distinct kata projects that have history entries (excludes central log only entries).
+    Count kata projects that have history (a non-empty LOG.md), from stats alone.
     """
-    entries = collect_entries(kata_root, notes_root, datetime.min)
-    projects = {project for project, _, _ in entries if project and project != "central"}
-    return len(projects)
+    # Every logged kata gets its own LOG.md, so the log text never needs parsing here.
+    try:
+        entries = os.scandir(kata_root)
+    except OSError:
+        return 0
+    count = 0
+    with entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                if os.stat(os.path.join(entry.path, "LOG.md")).st_size > 0:
+                    count += 1
+            except OSError:
+                continue
+    return count
 
 
 def quick_check_preview(project_dir: Path, notes_root: Path) -> tuple[bool, str]:
     """
     Run a lightweight unittest check and return (passed, summary).
     """
+    import subprocess
     if not (project_dir / "tests").exists():
         return False, "No tests folder found."
     install_dependencies(project_dir)
@@ -3665,13 +4110,13 @@ def peek_kata_summary(project_dir: Path, notes_root: Path) -> None:
     """
     Display a compact summary of a kata without launching the session.
     """
-    readme = (project_dir / "README.md").read_text().splitlines() if (project_dir / "README.md").exists() else []
-    mission = (project_dir / "MISSION.md").read_text().splitlines() if (project_dir / "MISSION.md").exists() else []
-    log_hint = last_lines(project_dir / "LOG.md", 3) if (project_dir / "LOG.md").exists() else "No project log yet."
-    def strip_heading(line: str) -> str:
-        return re.sub(r"^#+\s*", "", line).strip()
-    mission_excerpt = "\n".join(strip_heading(line) for line in mission[:8]) if mission else "MISSION.md missing."
-    readme_title = readme[0].lstrip("# ").strip() if readme else "README missing."
+    mission = head_lines(project_dir / "MISSION.md", 8)
+    log_hint = last_lines(project_dir / "LOG.md", 3) if cached_exists(project_dir / "LOG.md") else "No project log yet."
+    mission_excerpt = "\n".join(HEADING_PREFIX_RE.sub("", line).strip() for line in mission) if mission else "MISSION.md missing."
+    try:
+        readme_title = first_header_line(project_dir / "README.md") or "README is empty."
+    except FileNotFoundError:
+        readme_title = "README missing."
 
     body = (
         f"[bold]Path:[/bold] {project_dir.resolve()}\n"
@@ -3683,53 +4128,79 @@ def peek_kata_summary(project_dir: Path, notes_root: Path) -> None:
     type_out_text(mission_excerpt)
 
 
-def build_idea_prompt(
+# Only the head of the rubric goes into idea prompts; the rest costs tokens without changing picks.
+RUBRIC_PROMPT_MAX_BYTES = 2048
+
+
+def _gather_idea_context(
     kata_root: Path,
     notes_root: Path,
-    pillar_hint: Optional[str] = None,
-    level_hint: Optional[str] = None,
-    mode_hint: Optional[str] = None,
-) -> tuple[list[dict[str, str]], Optional[str]]:
+    pillar_hint: Optional[str],
+    level_hint: Optional[str],
+    mode_hint: Optional[str],
+) -> tuple[str, Optional[str]]:
     """
-    Build messages for the idea picker and determine weakest pillar.
+    Read the notes shared by the idea prompts once: returns the context block for the
+    user message and the weakest calibrated pillar.
     """
-    rubric_path = notes_root / "rubric.md"
-    rubric_text = rubric_path.read_text() if rubric_path.exists() else ""
+    rubric_text = head_text(notes_root / "rubric.md", RUBRIC_PROMPT_MAX_BYTES)
 
-    logs_path = notes_root / "log.md"
-    logs_snippet = last_lines(logs_path, 10) if logs_path.exists() else "No logs yet."
+    # EAFP: a missing note costs one failed open instead of an exists() stat before every read.
+    try:
+        logs_snippet = last_lines(notes_root / "log.md", 10)
+    except FileNotFoundError:
+        logs_snippet = "No logs yet."
 
-    cal_path = notes_root / "calibrations.md"
-    calib_scores = parse_calibrations(cal_path) if cal_path.exists() else {}
+    try:
+        calib_scores = parse_calibrations(notes_root / "calibrations.md")
+    except FileNotFoundError:
+        calib_scores = {}
     weakest = weakest_pillar(calib_scores)
     calib_text = ", ".join(f"{pillar}:{score}" for pillar, score in calib_scores.items()) or "none"
 
     katas = list_katas(kata_root)
     katas_text = ", ".join(katas) if katas else "none"
 
+    context = (
+        f"Weakest pillar: {weakest or 'unknown'}\n"
+        f"Pillar hint: {pillar_hint or 'unspecified'}\n"
+        f"Level hint: {level_hint or 'unspecified'}\n"
+        f"Mode hint: {mode_hint or 'unspecified'}\n"
+        f"Calibration scores: {calib_text}\n"
+        f"Existing katas: {katas_text}\n"
+        f"Recent logs (latest 10 lines):\n{logs_snippet}\n"
+        f"Rubric:\n{rubric_text}\n"
+    )
+    return context, weakest
+
+
+def build_idea_prompt(
+    kata_root: Path,
+    notes_root: Path,
+    pillar_hint: Optional[str] = None,
+    level_hint: Optional[str] = None,
+    mode_hint: Optional[str] = None,
+) -> tuple[list[dict[str, str]], Optional[str]]:
+    """
+    Build messages for the idea picker and determine weakest pillar.
+    """
+    context, weakest = _gather_idea_context(kata_root, notes_root, pillar_hint, level_hint, mode_hint)
+
     fallback_line = fallback_idea(
         pillar_hint=pillar_hint,
         level_hint=level_hint,
         mode_hint=mode_hint,
     ) or "IDEA: Unit converter -- CLI to convert units with input validation."
+    # Only the title goes into the prompt; the spec sentence costs tokens on every call.
+    fallback_title = strip_idea_prefix(fallback_line).split(" -- ", 1)[0]
 
     system = (
         "You are the NexusDojo idea picker. Return ONE idea only in this exact format:\n"
         "IDEA: <short title> -- <1 sentence spec>\n"
         "Keep it runnable in under a few hours. No prefacing text. No extra bullets.\n"
-        f"If you cannot generate from context, emit this fallback verbatim: {strip_idea_prefix(fallback_line)}"
-    )
-    user = (
-        f"Weakest pillar: {weakest or 'unknown'}\n"
-        f"Pillar hint: {pillar_hint or 'unspecified'}\n"
-        f"Level hint: {level_hint or 'unspecified'}\n"
-        f"Mode hint: {mode_hint or 'unspecified'}\n"
-        f"Calibration scores: {calib_text}\n"
-        f"Existing katas: {katas_text}\n"
-        f"Recent logs (latest 10 lines):\n{logs_snippet}\n"
-        f"Rubric:\n{rubric_text}\n"
-        "Return exactly one line starting with 'IDEA:' and nothing else."
+        f"If you cannot generate from context, use this title: {fallback_title}"
     )
+    user = context + "Return exactly one line starting with 'IDEA:' and nothing else."
     return [{"role": "system", "content": system}, {"role": "user", "content": user}], weakest
 
 
@@ -3744,36 +4215,34 @@ def build_idea_prompt_multi(
     """
     Build messages that request a short list of kata ideas.
     """
-    messages, weakest = build_idea_prompt(
-        kata_root=kata_root,
-        notes_root=notes_root,
-        pillar_hint=pillar_hint,
-        level_hint=level_hint,
-        mode_hint=mode_hint,
-    )
+    context, weakest = _gather_idea_context(kata_root, notes_root, pillar_hint, level_hint, mode_hint)
     system = (
         "You are the NexusDojo idea picker. Return up to "
         f"{max_options} ideas as bullet lines. Each line MUST start with "
         "'IDEA:' then a short title, then '--' then a one-sentence spec. "
         "No intro or outro text."
     )
-    user_lines = [line for line in messages[1]["content"].splitlines() if not line.startswith("Return")]
-    user_lines.append(
-        f"Return up to {max_options} lines, each starting with 'IDEA:' and containing a one-sentence spec."
-    )
-    messages[0]["content"] = system
-    messages[1]["content"] = "\n".join(user_lines)
-    return messages, weakest
+    user = context + f"Return up to {max_options} lines, each starting with 'IDEA:' and containing a one-sentence spec."
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}], weakest
 
 
 def build_hint_prompt(project_dir: Path, notes_root: Path, question: str) -> list[dict[str, str]]:
     """
     Build messages for the hint generator with local context.
     """
-    readme = (project_dir / "README.md").read_text() if (project_dir / "README.md").exists() else ""
-    recent_log = last_lines(project_dir / "LOG.md", 5) if (project_dir / "LOG.md").exists() else "No project log yet."
-    central_log = last_lines(notes_root / "log.md", 5) if (notes_root / "log.md").exists() else ""
-    calib = parse_calibrations(notes_root / "calibrations.md") if (notes_root / "calibrations.md").exists() else {}
+    readme = read_or_empty(project_dir / "README.md")
+    try:
+        recent_log = last_lines(project_dir / "LOG.md", 5)
+    except FileNotFoundError:
+        recent_log = "No project log yet."
+    try:
+        central_log = last_lines(notes_root / "log.md", 5)
+    except FileNotFoundError:
+        central_log = ""
+    try:
+        calib = parse_calibrations(notes_root / "calibrations.md")
+    except FileNotFoundError:
+        calib = {}
     weakest = weakest_pillar(calib)
 
     system = (
@@ -3798,8 +4267,11 @@ def build_test_hint_prompt(project_dir: Path, notes_root: Path, max_hints: int)
     """
     Build messages for generating edge-case test hints.
     """
-    readme = (project_dir / "README.md").read_text() if (project_dir / "README.md").exists() else ""
-    recent_log = last_lines(project_dir / "LOG.md", 5) if (project_dir / "LOG.md").exists() else "No project log yet."
+    readme = read_or_empty(project_dir / "README.md")
+    try:
+        recent_log = last_lines(project_dir / "LOG.md", 5)
+    except FileNotFoundError:
+        recent_log = "No project log yet."
     system = (
         "You are the NexusDojo test coach. Propose edge cases to test.\n"
         f"- Return a bullet list (one line each), max {max_hints} items.\n"
@@ -3819,94 +4291,284 @@ def generate_with_progress(
     task_name: str,
     provider: str,
     model: str,
-    messages: list[dict[str, str]]
+    messages: list[dict[str, str]],
+    cache_dir: Optional[Path] = None,
 ) -> Optional[str]:
     """
-    Wraps call_idea_api with a nice multi-step progress spinner.
+    Wraps call_idea_api with a spinner that shows the response as it streams in.
+    Ctrl+C aborts the request and returns None.
     """
-    steps = [
-        "Analyzing request...",
-        "Consulting the archives...",
-        "Drafting response...",
-        "Refining logic...",
-        "Finalizing output..."
-    ]
-    
-    # Since we can't update text during the blocking call easily without threads,
-    # we'll just show a nice indeterminate spinner with a fixed title, 
-    # but initially cycle a few messages to show "life".
-    # Actually, let's just use a nice bold spinner.
-    
-    with console.status(f"[bold green]{task_name}...[/bold green]", spinner="dots") as status:
-        # We can't cycle messages during urlopen block.
-        # But we can simulate "Thinking" start.
-        time.sleep(0.5)
-        status.update(f"[bold green]{task_name}: Connecting to {provider}...[/bold green]")
-        return call_idea_api(provider, model, messages)
+    if cache_dir is not None:
+        cached = read_llm_cache(cache_dir, llm_cache_key(provider, model, messages))
+        if cached:
+            return cached
+
+    spinner = Spinner("dots", text=Text.from_markup(f"[bold green]{task_name}: Connecting to {provider}...[/bold green]"))
+    streamed: list[str] = []
+    with Live(spinner, console=console, refresh_per_second=12, transient=True) as live:
+
+        def on_chunk(chunk: str) -> None:
+            if not streamed:
+                spinner.update(text=Text.from_markup(f"[bold green]{task_name}...[/bold green]"))
+            streamed.append(chunk)
+            tail = "\n".join("".join(streamed).splitlines()[-STREAM_PREVIEW_LINES:])
+            live.update(Group(spinner, Text(tail, style="dim")))
 
+        try:
+            return call_idea_api(provider, model, messages, cache_dir=cache_dir, on_chunk=on_chunk)
+        except KeyboardInterrupt:
+            live.stop()
+            console.print("[yellow]Cancelled.[/yellow]")
+            return None
 
-def call_idea_api(provider: str, model: str, messages: list[dict[str, str]]) -> Optional[str]:
+
+def llm_cache_key(provider: str, model: str, messages: list[dict[str, str]]) -> str:
     """
-    Call the selected provider to get idea suggestions.
+    Hash a normalized request payload; pillar/level/template hints live inside the messages.
+    """
+    payload = json.dumps(
+        {"provider": provider, "model": model, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# In-process layer over the on-disk LLM cache: cache file path -> (written at, content).
+_LLM_MEMO: dict[Path, tuple[float, str]] = {}
+
+
+def read_llm_cache(cache_dir: Path, key: str, ttl: float = LLM_CACHE_TTL_SECONDS) -> Optional[str]:
+    """
+    Return a cached LLM response if present and younger than ttl seconds.
+    Responses seen earlier in this process are served without touching the disk.
+    """
+    path = cache_dir / f"{key}.json"
+    memo = _LLM_MEMO.get(path)
+    if memo is not None:
+        written_at, content = memo
+        return content if time.time() - written_at <= ttl else None
+    try:
+        written_at = path.stat().st_mtime
+        if time.time() - written_at > ttl:
+            return None
+        data = json.loads(path.read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return None
+    content = data.get("content") if isinstance(data, dict) else None
+    if not (isinstance(content, str) and content):
+        return None
+    _LLM_MEMO[path] = (written_at, content)
+    return content
+
+
+def write_llm_cache(cache_dir: Path, key: str, content: str) -> None:
+    """
+    Persist an LLM response; cache failures never interrupt the caller.
+    """
+    path = cache_dir / f"{key}.json"
+    _LLM_MEMO[path] = (time.time(), content)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(json.dumps({"content": content}, separators=COMPACT_JSON_SEPARATORS).encode("utf-8"))
+    except OSError:
+        pass
+
+
+# Socket timeout for LLM provider connections; local models can take a while on the first token.
+LLM_HTTP_TIMEOUT_SECONDS = 120
+# Open HTTP(S) connections by (scheme, host), reused so repeat LLM calls skip TCP/TLS setup.
+_HTTP_CONNECTIONS: dict[tuple[str, str], Any] = {}
+
+
+def drop_keepalive_connection(url: str) -> None:
+    """
+    Close and forget the cached connection for a URL's host, if any.
+    """
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    conn = _HTTP_CONNECTIONS.pop((parts.scheme, parts.netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def keepalive_post(url: str, payload: bytes, headers: dict[str, str], timeout: float = LLM_HTTP_TIMEOUT_SECONDS) -> Any:
+    """
+    POST over a cached keep-alive connection and return the http.client response.
+    A cached connection the server already closed is replaced once; read the
+    response to the end before the next request on the same host.
+    Only stale-socket errors are retried: a timeout or a failure after the server
+    started answering is raised, so a generation is never requested twice.
+    """
+    import http.client
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    while True:
+        conn = _HTTP_CONNECTIONS.get(key)
+        reused = conn is not None
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(parts.netloc, timeout=timeout)
+            _HTTP_CONNECTIONS[key] = conn
+        try:
+            try:
+                conn.request("POST", path, body=payload, headers=headers)
+            except (BrokenPipeError, ConnectionResetError):
+                # The idle socket was closed under us while sending.
+                if not reused:
+                    raise
+                drop_keepalive_connection(url)
+                continue
+            try:
+                return conn.getresponse()
+            except http.client.RemoteDisconnected:
+                # Closed before a single response byte: the server dropped the idle connection.
+                if not reused:
+                    raise
+                drop_keepalive_connection(url)
+                continue
+        except (OSError, http.client.HTTPException):
+            drop_keepalive_connection(url)
+            raise
+
+
+def call_idea_api(
+    provider: str,
+    model: str,
+    messages: list[dict[str, str]],
+    cache_dir: Optional[Path] = None,
+    cache_only: bool = False,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> Optional[str]:
     """
+    Call the selected provider to get idea suggestions.
+    When cache_dir is set, identical requests are served from disk; cache_only skips the network.
+    When on_chunk is set, the response is streamed and each content delta is passed to it.
+    """
+    cache_key = None
+    if cache_dir is not None:
+        cache_key = llm_cache_key(provider, model, messages)
+        cached = read_llm_cache(cache_dir, cache_key)
+        if cached:
+            return cached
+    if cache_only:
+        return None
+
     if provider == "ollama":
+        import http.client
+
         payload = json.dumps(
-            {"model": model, "messages": messages, "stream": False}
+            {"model": model, "messages": messages, "stream": on_chunk is not None},
+            separators=COMPACT_JSON_SEPARATORS,
         ).encode("utf-8")
         headers = {"Content-Type": "application/json"}
-        request = urllib.request.Request(
-            OLLAMA_URL,
-            data=payload,
-            headers=headers,
-            method="POST",
-        )
         try:
-            with urllib.request.urlopen(request, timeout=120) as resp:
-                raw = resp.read()
-                data = json.loads(raw.decode("utf-8"))
-                content = ""
-                if isinstance(data, dict):
-                    content = data.get("message", {}).get("content", "") or data.get("response", "")
-        except (urllib.error.URLError, urllib.error.HTTPError) as exc:
+            # The local server keeps the socket open, so menu sessions skip a reconnect per idea.
+            with keepalive_post(OLLAMA_URL, payload, headers) as resp:
+                if resp.status >= 400:
+                    resp.read()
+                    print(f"API call failed: HTTP Error {resp.status}: {resp.reason}", file=sys.stderr)
+                    return None
+                if on_chunk is not None:
+                    # Streaming replies are one JSON object per line.
+                    parts = []
+                    for raw_line in resp:
+                        if not raw_line.strip():
+                            continue
+                        data = json.loads(raw_line)
+                        chunk = data.get("message", {}).get("content", "") or data.get("response", "")
+                        if chunk:
+                            parts.append(chunk)
+                            on_chunk(chunk)
+                        if data.get("done"):
+                            break
+                    # Drain anything after the final object so the connection can be reused.
+                    resp.read()
+                    content = "".join(parts)
+                else:
+                    raw = resp.read()
+                    data = json.loads(raw)
+                    content = ""
+                    if isinstance(data, dict):
+                        content = data.get("message", {}).get("content", "") or data.get("response", "")
+        except (OSError, http.client.HTTPException) as exc:
+            drop_keepalive_connection(OLLAMA_URL)
             print(f"API call failed: {exc}", file=sys.stderr)
             return None
         except (json.JSONDecodeError, IndexError, AttributeError):
+            drop_keepalive_connection(OLLAMA_URL)
             print("Unexpected API response shape.", file=sys.stderr)
             return None
+        except BaseException:
+            # Aborted mid-stream (e.g. Ctrl+C in on_chunk): unread chunks would poison the next request.
+            drop_keepalive_connection(OLLAMA_URL)
+            raise
     elif provider == "openrouter":
         api_key = os.environ.get("NEXUSDOJO_API_KEY")
         if not api_key:
             print("Missing NEXUSDOJO_API_KEY env var.", file=sys.stderr)
             return None
 
-        payload = json.dumps({"model": model, "messages": messages}).encode("utf-8")
+        body: dict[str, Any] = {"model": model, "messages": messages}
+        if on_chunk is not None:
+            body["stream"] = True
+        payload = json.dumps(body, separators=COMPACT_JSON_SEPARATORS).encode("utf-8")
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
 
-        request = urllib.request.Request(
-            OPENROUTER_URL,
-            data=payload,
-            headers=headers,
-            method="POST",
-        )
+        import http.client
 
         try:
-            with urllib.request.urlopen(request, timeout=120) as resp:
-                raw = resp.read()
-                data = json.loads(raw.decode("utf-8"))
-                content = (
-                    data.get("choices", [{}])[0]
-                    .get("message", {})
-                    .get("content", "")
-                )
-        except (urllib.error.URLError, urllib.error.HTTPError) as exc:
+            with keepalive_post(OPENROUTER_URL, payload, headers) as resp:
+                if resp.status >= 400:
+                    resp.read()
+                    print(f"API call failed: HTTP Error {resp.status}: {resp.reason}", file=sys.stderr)
+                    return None
+                if on_chunk is not None:
+                    # Server-sent events: "data: {...}" lines, terminated by "data: [DONE]".
+                    parts = []
+                    for raw_line in resp:
+                        if not raw_line.startswith(b"data:"):
+                            continue
+                        event = raw_line[5:].strip()
+                        if event == b"[DONE]":
+                            break
+                        data = json.loads(event)
+                        chunk = data.get("choices", [{}])[0].get("delta", {}).get("content") or ""
+                        if chunk:
+                            parts.append(chunk)
+                            on_chunk(chunk)
+                    # Drain the stream terminator so the connection can be reused.
+                    resp.read()
+                    content = "".join(parts)
+                else:
+                    raw = resp.read()
+                    data = json.loads(raw)
+                    content = (
+                        data.get("choices", [{}])[0]
+                        .get("message", {})
+                        .get("content", "")
+                    )
+        except (OSError, http.client.HTTPException) as exc:
+            drop_keepalive_connection(OPENROUTER_URL)
             print(f"API call failed: {exc}", file=sys.stderr)
             return None
         except (json.JSONDecodeError, IndexError, AttributeError):
+            drop_keepalive_connection(OPENROUTER_URL)
             print("Unexpected API response shape.", file=sys.stderr)
             return None
+        except BaseException:
+            # Aborted mid-stream (e.g. Ctrl+C in on_chunk): unread chunks would poison the next request.
+            drop_keepalive_connection(OPENROUTER_URL)
+            raise
     else:
         print(f"Unsupported provider: {provider}", file=sys.stderr)
         return None
@@ -3914,26 +4576,36 @@ def call_idea_api(provider: str, model: str, messages: list[dict[str, str]]) ->
     if not content:
         print("Empty idea content returned.", file=sys.stderr)
         return None
-    return content.strip()
+    content = content.strip()
+    if cache_key is not None:
+        write_llm_cache(cache_dir, cache_key, content)
+    return content
+
+
+# First "pillar=..." / "score=..." whitespace-separated token on a calibration line.
+CALIBRATION_PILLAR_RE = re.compile(r"(?<!\S)pillar=(\S*)")
+CALIBRATION_SCORE_RE = re.compile(r"(?<!\S)score=(\S*)")
 
 
+@mtime_cached(lambda path: (path,))
 def parse_calibrations(path: Path) -> dict[str, int]:
     """
     Parse calibration scores per pillar; returns latest score per pillar.
+    The returned dict is shared between cached calls; do not mutate it.
     """
     scores: dict[str, int] = {}
-    for line in path.read_text().splitlines():
-        if "pillar=" not in line or "score=" not in line:
-            continue
-        try:
-            parts = line.split()
-            pillar_part = next(p for p in parts if p.startswith("pillar="))
-            score_part = next(p for p in parts if p.startswith("score="))
-            pillar = pillar_part.split("=", 1)[1]
-            score = int(score_part.split("=", 1)[1])
-            scores[pillar] = score
-        except (StopIteration, ValueError):
-            continue
+    with path.open("r", buffering=LOG_READ_BUFFER_SIZE) as handle:
+        for line in handle:
+            if "pillar=" not in line or "score=" not in line:
+                continue
+            pillar_match = CALIBRATION_PILLAR_RE.search(line)
+            score_match = CALIBRATION_SCORE_RE.search(line)
+            if not pillar_match or not score_match:
+                continue
+            try:
+                scores[pillar_match.group(1)] = int(score_match.group(1))
+            except ValueError:
+                continue
     return scores
 
 
@@ -3950,16 +4622,90 @@ def list_katas(kata_root: Path) -> list[str]:
     """
     List existing kata slugs.
     """
-    if not kata_root.exists():
+    try:
+        with os.scandir(kata_root) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir())
+    except OSError:
+        return []
+
+
+
+def first_header_line(path: Path) -> str:
+    """
+    Return the first non-empty line of a file with heading markers stripped,
+    reading only until that line. Raises FileNotFoundError for missing files.
+    """
+    with path.open("r", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            text = HEADING_PREFIX_RE.sub("", line.strip()).strip()
+            if text:
+                return text
+    return ""
+
+
+def read_or_empty(path: Path) -> str:
+    """
+    Return a file's text, or an empty string if it does not exist (one open, no stat).
+    """
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ""
+
+
+@mtime_cached(lambda path, max_bytes: (path,), maxsize=32)
+def head_text(path: Path, max_bytes: int) -> str:
+    """
+    Return at most the first max_bytes of a file as text in a single read.
+    Missing files yield an empty string.
+    """
+    try:
+        with path.open("rb") as handle:
+            return handle.read(max_bytes).decode("utf-8", errors="replace")
+    except FileNotFoundError:
+        return ""
+
+
+def head_lines(path: Path, n: int) -> list[str]:
+    """
+    Return the first n lines of a file (without newlines), reading no further than needed.
+    Missing files yield an empty list.
+    """
+    try:
+        with path.open("r", encoding="utf-8", errors="replace") as handle:
+            return [line.rstrip("\r\n") for line in itertools.islice(handle, n)]
+    except FileNotFoundError:
         return []
-    return sorted([p.name for p in kata_root.iterdir() if p.is_dir()])
 
 
+# Block size for last_lines' backwards reads; one block covers the usual ten-line tail.
+TAIL_BLOCK_SIZE = 8192
+
+
+@mtime_cached(lambda path, n: (path,), maxsize=32)
 def last_lines(path: Path, n: int) -> str:
     """
     Return the last n lines from a file as a single string.
+    Reads blocks backwards from the end of the file until they span n + 1 newlines, so the
+    earliest kept line is complete; only that tail is decoded.
     """
-    lines = path.read_text().splitlines()
+    if n <= 0:
+        return ""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        offset = os.fstat(fd).st_size
+        blocks: list[bytes] = []
+        newlines = 0
+        while offset > 0 and newlines <= n:
+            read = min(TAIL_BLOCK_SIZE, offset)
+            offset -= read
+            block = os.pread(fd, read, offset)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+    finally:
+        os.close(fd)
+    blocks.reverse()
+    lines = b"".join(blocks).decode("utf-8", errors="replace").splitlines()
     return "\n".join(lines[-n:])
 
 
@@ -3975,6 +4721,68 @@ def pick_idea(provider: str, model: str, kata_root: Path, notes_root: Path) -> O
     return None
 
 
+def idea_signature(
+    provider: str,
+    model: str,
+    pillar_hint: Optional[str],
+    level_hint: Optional[str],
+    mode_hint: Optional[str],
+    weakest: Optional[str],
+) -> str:
+    """
+    Stable key for the hint combination an idea was generated for.
+    The weakest calibrated pillar is part of the prompt context, so it is part of the key.
+    """
+    return "|".join((provider, model, pillar_hint or "", level_hint or "", mode_hint or "", weakest or ""))
+
+
+def load_idea_semcache(notes_root: Path) -> dict[str, list[dict[str, Any]]]:
+    """
+    Load the signature -> recent ideas map (empty if missing or unreadable).
+    """
+    try:
+        data = json.loads((notes_root / IDEA_SEMCACHE_FILENAME).read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def lookup_recent_idea(notes_root: Path, kata_root: Path, signature: str) -> Optional[str]:
+    """
+    Return the newest idea stored for a signature if it is younger than the TTL.
+    Ideas whose kata already exists under kata_root are skipped, so repeated starts move on.
+    """
+    entries = load_idea_semcache(notes_root).get(signature) or []
+    now = time.time()
+    for entry in reversed(entries):
+        if not isinstance(entry, dict) or now - entry.get("ts", 0) >= IDEA_SEMCACHE_TTL_SECONDS:
+            continue
+        idea = entry.get("idea")
+        if idea and not (kata_root / slugify(strip_idea_prefix(idea))).exists():
+            return idea
+    return None
+
+
+def remember_idea(notes_root: Path, signature: str, idea: str) -> None:
+    """
+    Record a freshly generated idea, keeping a few per signature and evicting the
+    least recently written signatures beyond the cap.
+    """
+    cache = load_idea_semcache(notes_root)
+    entries = cache.pop(signature, [])
+    entries.append({"idea": idea, "ts": time.time()})
+    cache[signature] = entries[-IDEA_SEMCACHE_PER_SIGNATURE:]
+    while len(cache) > IDEA_SEMCACHE_MAX_SIGNATURES:
+        cache.pop(next(iter(cache)))
+    try:
+        notes_root.mkdir(parents=True, exist_ok=True)
+        (notes_root / IDEA_SEMCACHE_FILENAME).write_bytes(
+            json.dumps(cache, separators=COMPACT_JSON_SEPARATORS).encode("utf-8")
+        )
+    except OSError:
+        pass
+
+
 def pick_idea_with_hints(
     provider: str,
     model: str,
@@ -3987,9 +4795,18 @@ def pick_idea_with_hints(
 ) -> tuple[Optional[str], bool]:
     """
     Generate an idea using hints; fall back to canned ideas if needed.
+    A fresh idea for the same hints is reused before building a prompt.
+    Offline runs only consult the caches and always report the fallback flag, since the
+    LLM was never reached.
     """
-    if offline:
-        return fallback_idea(pillar_hint=pillar_hint, level_hint=level_hint, mode_hint=mode_hint), True
+    try:
+        weakest = weakest_pillar(parse_calibrations(notes_root / "calibrations.md"))
+    except FileNotFoundError:
+        weakest = None
+    signature = idea_signature(provider, model, pillar_hint, level_hint, mode_hint, weakest)
+    recent = lookup_recent_idea(notes_root, kata_root, signature)
+    if recent:
+        return recent, offline
     messages, _ = build_idea_prompt(
         kata_root=kata_root,
         notes_root=notes_root,
@@ -3997,10 +4814,15 @@ def pick_idea_with_hints(
         level_hint=level_hint,
         mode_hint=mode_hint,
     )
-    content = generate_with_progress("Generating Idea", provider, model, messages)
+    cache_dir = notes_root / LLM_CACHE_DIRNAME
+    if offline:
+        content = call_idea_api(provider, model, messages, cache_dir=cache_dir, cache_only=True)
+    else:
+        content = generate_with_progress("Generating Idea", provider, model, messages, cache_dir=cache_dir)
     idea = parse_idea_content(content) if content else None
     if idea:
-        return idea, False
+        remember_idea(notes_root, signature, idea)
+        return idea, offline
     return fallback_idea(pillar_hint=pillar_hint, level_hint=level_hint, mode_hint=mode_hint), True
 
 
@@ -4017,14 +4839,8 @@ def pick_idea_options(
 ) -> tuple[list[str], bool]:
     """
     Generate a short list of ideas; fall back to curated options.
+    Offline runs only consult the LLM cache.
     """
-    if offline:
-        return fallback_idea_options(
-            pillar_hint=pillar_hint,
-            level_hint=level_hint,
-            mode_hint=mode_hint,
-            max_options=max_options,
-        ), True
     messages, _ = build_idea_prompt_multi(
         kata_root=kata_root,
         notes_root=notes_root,
@@ -4033,7 +4849,13 @@ def pick_idea_options(
         mode_hint=mode_hint,
         max_options=max_options,
     )
-    content = call_idea_api(provider=provider, model=model, messages=messages)
+    content = call_idea_api(
+        provider=provider,
+        model=model,
+        messages=messages,
+        cache_dir=notes_root / LLM_CACHE_DIRNAME,
+        cache_only=offline,
+    )
     options = parse_idea_options(content, max_options) if content else []
     if options:
         return options[:max_options], False
@@ -4045,6 +4867,13 @@ def pick_idea_options(
     ), True
 
 
+def has_idea_prefix(text: str) -> bool:
+    """
+    True if text starts with a case-insensitive "IDEA:" label; lowercases only the label, not the line.
+    """
+    return text[:5].lower() == "idea:"
+
+
 def parse_idea_content(content: Optional[str]) -> Optional[str]:
     """
     Extract a single idea line from model output.
@@ -4055,9 +4884,9 @@ def parse_idea_content(content: Optional[str]) -> Optional[str]:
         cleaned = line.strip()
         if not cleaned:
             continue
-        if cleaned.lower().startswith("idea:"):
+        if has_idea_prefix(cleaned):
             return normalize_idea_line(cleaned)
-        if cleaned.startswith(("-", "*", "•")):
+        if cleaned.startswith(BULLET_PREFIXES):
             cleaned = cleaned.lstrip("-*• ").strip()
         if cleaned:
             return normalize_idea_line(cleaned)
@@ -4085,19 +4914,9 @@ def parse_idea_options(content: Optional[str], max_options: int) -> list[str]:
     return options
 
 
-def fallback_idea(
-    pillar_hint: Optional[str],
-    level_hint: Optional[str],
-    mode_hint: Optional[str],
-) -> Optional[str]:
-    """
-    Provide a deterministic idea if the model call fails.
-    """
-    pillar = pillar_hint or "mixed"
-    level = level_hint or "foundation"
-    mode = mode_hint or "script"
-
-    ideas = {
+# Offline idea catalog keyed by (pillar, level).
+FALLBACK_IDEAS: Mapping[tuple[str, str], str] = MappingProxyType(
+    {
         ("python", "foundation"): "IDEA: Basic calculator -- Build add/subtract/multiply/divide CLI with input validation.",
         ("python", "proficient"): "IDEA: CSV summarizer -- Load a CSV and print min/max/avg for numeric columns.",
         ("python", "stretch"): "IDEA: Config loader -- Parse a YAML/JSON config and validate required fields.",
@@ -4114,10 +4933,27 @@ def fallback_idea(
         ("mixed", "proficient"): "IDEA: Markdown heading extractor -- CLI to list headings from a .md file.",
         ("mixed", "stretch"): "IDEA: Simple RPN calculator -- CLI with stack ops and tests.",
     }
+)
+
+
+@functools.lru_cache(maxsize=64)
+def fallback_idea(
+    pillar_hint: Optional[str],
+    level_hint: Optional[str],
+    mode_hint: Optional[str],
+) -> Optional[str]:
+    """
+    Provide a deterministic idea if the model call fails.
+    Memoized: the catalog is static and the hints are plain strings.
+    """
+    pillar = pillar_hint or "mixed"
+    level = level_hint or "foundation"
+    mode = mode_hint or "script"
+
     key = (pillar, level)
-    idea = ideas.get(key) or ideas.get(("mixed", level)) or ideas.get(("mixed", "foundation"))
+    idea = FALLBACK_IDEAS.get(key) or FALLBACK_IDEAS.get(("mixed", level)) or FALLBACK_IDEAS.get(("mixed", "foundation"))
     if mode == "api" and "API" not in idea:
-        idea = ideas.get(("api", level)) or idea
+        idea = FALLBACK_IDEAS.get(("api", level)) or idea
     return idea
 
 
@@ -4161,18 +4997,28 @@ def calibration_trend(path: Path) -> dict[str, int]:
     """
     Compute score deltas per pillar from calibration history.
     """
-    deltas: dict[str, list[int]] = {}
-    for line in path.read_text().splitlines():
-        if "pillar=" not in line or "score=" not in line:
-            continue
-        try:
-            parts = line.split()
-            pillar = next(p for p in parts if p.startswith("pillar=")).split("=", 1)[1]
-            score = int(next(p for p in parts if p.startswith("score=")).split("=", 1)[1])
-        except (StopIteration, ValueError):
-            continue
-        deltas.setdefault(pillar, []).append(score)
-    return {pillar: scores[-1] - scores[0] for pillar, scores in deltas.items() if len(scores) >= 2}
+    # Only the first and last score per pillar matter: [first, last, count].
+    first_last: dict[str, list[int]] = {}
+    with path.open("r", buffering=LOG_READ_BUFFER_SIZE) as handle:
+        for line in handle:
+            if "pillar=" not in line or "score=" not in line:
+                continue
+            pillar_match = CALIBRATION_PILLAR_RE.search(line)
+            score_match = CALIBRATION_SCORE_RE.search(line)
+            if not pillar_match or not score_match:
+                continue
+            pillar = pillar_match.group(1)
+            try:
+                score = int(score_match.group(1))
+            except ValueError:
+                continue
+            entry = first_last.get(pillar)
+            if entry is None:
+                first_last[pillar] = [score, score, 1]
+            else:
+                entry[1] = score
+                entry[2] += 1
+    return {pillar: last - first for pillar, (first, last, count) in first_last.items() if count >= 2}
 
 
 def practice_balance(scores: dict[str, int]) -> str:
@@ -4189,38 +5035,82 @@ def practice_balance(scores: dict[str, int]) -> str:
     return " | ".join(parts)
 
 
+def format_log_stamp(moment: datetime) -> str:
+    """
+    Format a log timestamp ("YYYY-MM-DD HH:MM") from the datetime fields, skipping strftime.
+    """
+    return f"{moment.year:04d}-{moment.month:02d}-{moment.day:02d} {moment.hour:02d}:{moment.minute:02d}"
+
+
+# Per-file memo: a repeat scan only reparses logs whose (mtime_ns, size) moved.
+@mtime_cached(lambda path, default_project, since: (path,), maxsize=256)
 def parse_log_file(path: Path, default_project: str, since: datetime) -> list[tuple[str, str, str]]:
     """
     Parse log entries of the form "- [YYYY-MM-DD HH:MM] note".
     """
     parsed: list[tuple[str, str, str]] = []
-    for line in path.read_text().splitlines():
-        if not line.startswith("- ["):
-            continue
-        try:
-            ts_part, note_part = line[3:].split("]", 1)
-            ts = datetime.strptime(ts_part.strip(), "%Y-%m-%d %H:%M")
-        except ValueError:
-            continue
-        if ts < since:
-            continue
-        note = note_part.strip()
-        # Remove leading colon if present from central log formatting.
-        if note.startswith(":"):
-            note = note[1:].strip()
-        project = default_project
-        if ":" in note:
-            possible_project, maybe_note = note.split(":", 1)
-            if possible_project and " " not in possible_project:
-                project = possible_project
-                note = maybe_note.strip()
-        parsed.append((project, ts.strftime("%Y-%m-%d %H:%M"), note))
+    # Fixed-width stamps sort like the datetimes they encode, so entries before the cutoff are
+    # dropped on the string alone. Rounding up to a whole minute keeps "ts >= since" exact.
+    cutoff = since.replace(second=0, microsecond=0)
+    if cutoff < since:
+        cutoff += timedelta(minutes=1)
+    since_stamp = format_log_stamp(cutoff)
+    # Consecutive entries often share a minute; a repeated stamp is already known to be valid.
+    last_stamp: Optional[str] = None
+    with path.open("rb", buffering=LOG_READ_BUFFER_SIZE) as handle:
+        for raw_line in handle:
+            # Headings and blank lines are rejected on the raw bytes; only entries get decoded.
+            if not raw_line.startswith(LOG_ENTRY_PREFIX_BYTES):
+                continue
+            line = raw_line.decode("utf-8", errors="replace")
+            match = LOG_LINE_RE.match(line)
+            if match:
+                stamp, project, note = match.groups()
+                if stamp < since_stamp:
+                    continue
+                note = note.strip()
+                if stamp != last_stamp:
+                    try:
+                        # Only rejects impossible dates: the regex guarantees the fixed shape,
+                        # which fromisoformat checks in C.
+                        datetime.fromisoformat(stamp)
+                    except ValueError:
+                        continue
+                    last_stamp = stamp
+                # Entries sharing a minute (or a project) share one string object in the output.
+                stamp = last_stamp
+                if project:
+                    project = sys.intern(project)
+            else:
+                # Hand-edited entries (unpadded stamps) take the slow path.
+                end = line.find("]", 3)
+                if end < 0:
+                    continue
+                try:
+                    ts = datetime.strptime(line[3:end].strip(), "%Y-%m-%d %H:%M")
+                except ValueError:
+                    continue
+                if ts < since:
+                    continue
+                stamp = format_log_stamp(ts)
+                note = line[end + 1:].strip()
+                # Remove leading colon if present from central log formatting.
+                if note.startswith(":"):
+                    note = note[1:].strip()
+                project = None
+                colon = note.find(":")
+                if colon > 0 and " " not in note[:colon]:
+                    project = note[:colon]
+                    note = note[colon + 1:].strip()
+            parsed.append((project or default_project, stamp, note))
     return parsed
 
 
+@functools.lru_cache(maxsize=1024)
 def summarize_text(text: str, limit: int = 160) -> str:
     """
     Lightweight summarization by truncating and condensing whitespace.
+    Memoized: dashboard redraws and scaffold packs summarize the same strings repeatedly.
     """
     cleaned = " ".join(text.split())
     if len(cleaned) <= limit:
@@ -4253,40 +5143,56 @@ def parse_bullet_list(content: Optional[str]) -> list[str]:
         cleaned = line.strip()
         if not cleaned:
             continue
-        if cleaned.startswith(("-", "*", "•")):
+        if cleaned.startswith(BULLET_PREFIXES):
             cleaned = cleaned.lstrip("-*• ").strip()
         hints.append(cleaned)
     return hints
 
 
+def hint_log_lines(history: dict[str, list[str]]) -> bytes:
+    """
+    Serialize hint history as append-log lines: "project<TAB>timestamp".
+    """
+    return "".join(f"{project}\t{ts}\n" for project, stamps in history.items() for ts in stamps).encode("utf-8")
+
+
+@mtime_cached(lambda notes_root: (notes_root / HINT_LOG_FILENAME, notes_root / HINT_LEGACY_LOG_FILENAME))
 def load_hint_history(notes_root: Path) -> dict[str, list[str]]:
     """
     Load hint usage history.
     """
-    log_path = notes_root / "hints_log.json"
-    if not log_path.exists():
-        return {}
+    log_path = notes_root / HINT_LOG_FILENAME
     try:
-        data = json.loads(log_path.read_text())
-        return data if isinstance(data, dict) else {}
-    except json.JSONDecodeError:
-        return {}
+        raw = log_path.read_bytes()
+    except FileNotFoundError:
+        # One-time migration from the JSON history that was rewritten on every hint.
+        legacy_path = notes_root / HINT_LEGACY_LOG_FILENAME
+        try:
+            data = json.loads(legacy_path.read_bytes())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        write_atomic(log_path, hint_log_lines(data))
+        legacy_path.unlink()
+        return data
+    history: dict[str, list[str]] = {}
+    for line in raw.decode("utf-8", errors="replace").splitlines():
+        project, sep, ts = line.partition("\t")
+        if sep:
+            history.setdefault(project, []).append(ts)
+    return history
 
 
 def prune_hint_history(history: dict[str, list[str]], now: datetime) -> dict[str, list[str]]:
     """
     Remove entries older than 24h.
     """
+    # Stamps are written as "YYYY-MM-DDTHH:MM:SS", which sorts like the time it names.
+    cutoff = (now - timedelta(days=1)).isoformat(timespec="seconds")
     pruned: dict[str, list[str]] = {}
     for project, timestamps in history.items():
-        filtered: list[str] = []
-        for ts in timestamps:
-            try:
-                dt = datetime.fromisoformat(ts)
-            except ValueError:
-                continue
-            if now - dt <= timedelta(days=1):
-                filtered.append(ts)
+        filtered = [ts for ts in timestamps if len(ts) >= 19 and ts >= cutoff]
         if filtered:
             pruned[project] = filtered
     return pruned
@@ -4308,36 +5214,29 @@ def count_hints_today(notes_root: Path) -> int:
     """
     now = datetime.now()
     history = prune_hint_history(load_hint_history(notes_root), now)
-    total = 0
-    for timestamps in history.values():
-        total += len(timestamps)
-    return total
+    return sum(map(len, history.values()))
 
 
 def check_hint_rate_limit(project: str, notes_root: Path) -> tuple[bool, str, int]:
     """
     Enforce a short debounce for hint pulls. Daily limit is effectively unlimited.
     """
-    log_path = notes_root / "hints_log.json"
-    notes_root.mkdir(parents=True, exist_ok=True)
     now = datetime.now()
     history = prune_hint_history(load_hint_history(notes_root), now)
-    log_path.write_text(json.dumps(history, indent=2))
-    
-    project_entries = []
-    for ts in history.get(project, []):
+
+    # ISO stamps sort chronologically, so only the newest one needs parsing.
+    project_entries = history.get(project)
+    if project_entries:
         try:
-            project_entries.append(datetime.fromisoformat(ts))
+            last_ts = datetime.fromisoformat(max(project_entries))
         except ValueError:
-            continue
-            
-    if project_entries:
-        last_ts = max(project_entries)
-        elapsed = (now - last_ts).total_seconds()
-        if elapsed < HINT_COOLDOWN_SECONDS:
-            wait_for = int(HINT_COOLDOWN_SECONDS - elapsed)
-            return False, f"Debouncing... wait {wait_for}s.", 999
-            
+            last_ts = None
+        if last_ts is not None:
+            elapsed = (now - last_ts).total_seconds()
+            if elapsed < HINT_COOLDOWN_SECONDS:
+                wait_for = int(HINT_COOLDOWN_SECONDS - elapsed)
+                return False, f"Debouncing... wait {wait_for}s.", 999
+
     return True, "Ready", 999
 
 
@@ -4346,20 +5245,35 @@ def record_hint_use(project: str, notes_root: Path) -> None:
     Record a hint usage timestamp for rate limiting.
     """
     notes_root.mkdir(parents=True, exist_ok=True)
-    log_path = notes_root / "hints_log.json"
+    log_path = notes_root / HINT_LOG_FILENAME
     now_dt = datetime.now()
-    history = prune_hint_history(load_hint_history(notes_root), now_dt)
-    now = datetime.now().isoformat(timespec="seconds")
-    history.setdefault(project, []).append(now)
-    log_path.write_text(json.dumps(history, indent=2))
+    # Loading first migrates a legacy JSON history before the append creates the log.
+    load_hint_history(notes_root)
+    now = now_dt.isoformat(timespec="seconds")
+    with log_path.open("ab") as handle:
+        handle.write(f"{project}\t{now}\n".encode("utf-8"))
+        size = handle.tell()
+    if size > HINT_LOG_COMPACT_BYTES:
+        # Drop entries older than the 24h window once the log grows.
+        write_atomic(log_path, hint_log_lines(prune_hint_history(load_hint_history(notes_root), now_dt)))
+
+
+def readme_declares_fastapi(project_dir: Path) -> bool:
+    """
+    Check the kata README header for the "Template: fastapi" marker without reading the whole file.
+    """
+    try:
+        with (project_dir / "README.md").open("rb") as handle:
+            return b"Template: fastapi" in handle.read(TEMPLATE_MARKER_MAX_BYTES)
+    except FileNotFoundError:
+        return False
 
 
 def fallback_edge_hints(project_dir: Path) -> list[str]:
     """
     Provide deterministic edge-case hints based on template.
     """
-    readme_text = (project_dir / "README.md").read_text() if (project_dir / "README.md").exists() else ""
-    template = "fastapi" if "Template: fastapi" in readme_text else "script"
+    template = "fastapi" if readme_declares_fastapi(project_dir) else "script"
     if template == "fastapi":
         return [
             "Missing/empty query params for echo endpoint",
@@ -4375,13 +5289,21 @@ def fallback_edge_hints(project_dir: Path) -> list[str]:
     ]
 
 
-def write_edge_hint_tests(project_dir: Path, hints: list[str]) -> None:
+def ensure_tests_package(project_dir: Path) -> Path:
     """
-    Materialize edge-case hints as skipped tests for fast activation.
+    Make sure project_dir/tests exists as a package and return it; an existing __init__.py is left untouched.
     """
     tests_dir = project_dir / "tests"
     tests_dir.mkdir(parents=True, exist_ok=True)
-    (tests_dir / "__init__.py").write_text("", encoding="utf-8")
+    (tests_dir / "__init__.py").touch()
+    return tests_dir
+
+
+def write_edge_hint_tests(project_dir: Path, hints: list[str]) -> None:
+    """
+    Materialize edge-case hints as skipped tests for fast activation.
+    """
+    tests_dir = ensure_tests_package(project_dir)
     target = tests_dir / "test_edge_hints.py"
     lines = [
         '"""Auto-generated edge-case TODOs. Safe to edit."""',
@@ -4402,14 +5324,59 @@ def write_edge_hint_tests(project_dir: Path, hints: list[str]) -> None:
     target.write_text("\n".join(lines), encoding="utf-8")
 
 
+@functools.lru_cache(maxsize=8)
+def placeholder_pattern(keys: tuple[str, ...]) -> re.Pattern[str]:
+    """
+    One alternation matching {{KEY}} for each key, capturing the key.
+    """
+    return re.compile(r"\{\{(" + "|".join(map(re.escape, keys)) + r")\}\}")
+
+
+def fill_placeholders(text: str, replacements: dict[str, str]) -> str:
+    """
+    Replace {{KEY}} placeholders in a string with provided values.
+    """
+    if not replacements or "{{" not in text:
+        return text
+    pattern = placeholder_pattern(tuple(replacements))
+    return pattern.sub(lambda match: replacements[match.group(1)], text)
+
+
+@functools.lru_cache(maxsize=8)
+def placeholder_bytes_pattern(keys: tuple[str, ...]) -> re.Pattern[bytes]:
+    """
+    Bytes twin of placeholder_pattern, capturing the UTF-8 encoded key.
+    """
+    return re.compile(rb"\{\{(" + b"|".join(re.escape(key.encode("utf-8")) for key in keys) + rb")\}\}")
+
+
+def fill_placeholder_bytes(data: bytes, replacements: dict[str, str]) -> bytes:
+    """
+    Replace {{KEY}} placeholders in UTF-8 file contents without decoding them.
+    Placeholders are ASCII, so they can never start inside a multi-byte character.
+    """
+    if not replacements or b"{{" not in data:
+        return data
+    encoded = {key.encode("utf-8"): value.encode("utf-8") for key, value in replacements.items()}
+    pattern = placeholder_bytes_pattern(tuple(replacements))
+    return pattern.sub(lambda match: encoded[match.group(1)], data)
+
+
 def apply_placeholders(path: Path, replacements: dict[str, str]) -> None:
     """
     Replace {{KEY}} placeholders in a text file with provided values.
+    Files without any placeholder are left untouched (no rewrite, mtime kept).
     """
-    text = path.read_text()
-    for key, value in replacements.items():
-        text = text.replace(f"{{{{{key}}}}}", value)
-    path.write_text(text)
+    data = path.read_bytes()
+    filled = fill_placeholder_bytes(data, replacements)
+    if filled != data:
+        path.write_bytes(filled)
+
+
+# Runs of characters that cannot appear in a slug.
+SLUG_INVALID_RE = re.compile(r"[^a-z0-9]+")
+# Longest slug used for a kata directory; long model-written titles are cut here.
+SLUG_MAX_LENGTH = 64
 
 
 def slugify(text: str) -> str:
@@ -4418,7 +5385,14 @@ def slugify(text: str) -> str:
     """
     if "--" in text:
         text = text.split("--", 1)[0]
-    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    lowered = text.lower()
+    # Already slug-shaped (ASCII letters, digits, single hyphens): the substitution would be a no-op.
+    if lowered.isascii() and lowered.replace("-", "").isalnum():
+        slug = lowered.strip("-")
+    else:
+        slug = SLUG_INVALID_RE.sub("-", lowered).strip("-")
+    if len(slug) > SLUG_MAX_LENGTH:
+        slug = slug[:SLUG_MAX_LENGTH].rstrip("-")
     return slug
 
 
@@ -4426,32 +5400,83 @@ def next_available_slug(base_slug: str, kata_root: Path) -> str:
     """
     Find the next available slug by appending an incrementing suffix.
     """
+    try:
+        with os.scandir(kata_root) as it:
+            existing = {entry.name for entry in it}
+    except OSError:
+        existing = set()
     candidate = base_slug
     suffix = 2
-    while (kata_root / candidate).exists():
+    while candidate in existing:
         candidate = f"{base_slug}-{suffix}"
         suffix += 1
     return candidate
 
 
-def apply_placeholders_tree(root: Path, replacements: dict[str, str]) -> None:
+@functools.lru_cache(maxsize=None)
+def load_template_files(template_dir: Path) -> tuple[tuple[str, ...], tuple[tuple[str, bytes, int], ...]]:
     """
-    Apply placeholder replacements to all text files under a root directory.
+    Read a bundled template once per process.
+    Returns (relative directories, (relative path, bytes, mode) per file); templates never change at runtime.
     """
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.name.startswith(".") or path.suffix in {".pyc"}:
-            continue
-        try:
-            content = path.read_text()
-        except (OSError, UnicodeDecodeError):
-            continue
-        updated = content
-        for key, value in replacements.items():
-            updated = updated.replace(f"{{{{{key}}}}}", value)
-        if updated != content:
-            path.write_text(updated)
+    dirs: list[str] = []
+    files: list[tuple[str, bytes, int]] = []
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        with os.scandir(template_dir / rel_dir) as entries:
+            for entry in entries:
+                rel = os.path.join(rel_dir, entry.name)
+                if entry.is_dir():
+                    dirs.append(rel)
+                    pending.append(rel)
+                else:
+                    with open(entry.path, "rb") as handle:
+                        files.append((rel, handle.read(), os.fstat(handle.fileno()).st_mode))
+    return tuple(dirs), tuple(files)
+
+
+# Template files that may carry {{KEY}} placeholders; everything else is copied untouched.
+PLACEHOLDER_TEXT_SUFFIXES = frozenset({".py", ".md", ".txt", ".json", ".toml", ".yaml", ".yml", ".cfg"})
+
+
+def write_template_files(
+    template_dir: Path,
+    target_dir: Path,
+    dirs_exist_ok: bool = False,
+    replacements: Optional[dict[str, str]] = None,
+) -> None:
+    """
+    Materialize a cached template into target_dir (copytree semantics for an existing target).
+    With replacements, {{KEY}} placeholders in text files are filled on the way out.
+    """
+    dirs, files = load_template_files(template_dir)
+    target_dir.mkdir(parents=True, exist_ok=dirs_exist_ok)
+    for rel in dirs:
+        (target_dir / rel).mkdir(exist_ok=True)
+    for rel, data, mode in files:
+        path = target_dir / rel
+        if (
+            replacements
+            and b"{{" in data
+            and os.path.splitext(rel)[1] in PLACEHOLDER_TEXT_SUFFIXES
+            and not os.path.basename(rel).startswith(".")
+        ):
+            data = fill_placeholder_bytes(data, replacements)
+        path.write_bytes(data)
+        if mode & 0o111:
+            os.chmod(path, mode & 0o7777)
+
+
+@functools.lru_cache(maxsize=None)
+def load_static_main(template: str) -> Optional[str]:
+    """
+    Return the static, annotated main.py for a template (cached), or None if missing.
+    """
+    try:
+        return (STATIC_TEMPLATES_ROOT / template / "main.py").read_text()
+    except FileNotFoundError:
+        return None
 
 
 def resolve_template(template: str, mode_hint: Optional[str]) -> str:
@@ -4470,12 +5495,12 @@ def normalize_idea_line(content: str) -> str:
     cleaned = (content or "").strip()
     if not cleaned:
         cleaned = "Untitled kata"
-    if cleaned.lower().startswith("idea:"):
-        cleaned = cleaned.split(":", 1)[1].strip()
+    if has_idea_prefix(cleaned):
+        cleaned = cleaned[5:].strip()
     if "--" not in cleaned:
         cleaned = cleaned.replace("  ", " ")
         cleaned = f"{cleaned} -- crisp spec"
-    normalized = cleaned if cleaned.lower().startswith("idea:") else f"IDEA: {cleaned}"
+    normalized = cleaned if has_idea_prefix(cleaned) else f"IDEA: {cleaned}"
     return normalized.strip()
 
 
@@ -4484,8 +5509,8 @@ def strip_idea_prefix(content: str) -> str:
     Remove the leading IDEA: label if present.
     """
     cleaned = (content or "").strip()
-    if cleaned.lower().startswith("idea:"):
-        return cleaned.split(":", 1)[1].strip()
+    if has_idea_prefix(cleaned):
+        return cleaned[5:].strip()
     return cleaned
 
 
@@ -4495,12 +5520,12 @@ def generate_scaffold_spec(
     level_hint: Optional[str],
     template: str,
     offline: bool = False,
+    notes_root: Path = DEFAULT_NOTES_ROOT,
 ) -> tuple[dict[str, Any], bool]:
     """
     Generate a scaffold spec using the default idea provider with safe fallback.
+    Offline runs only consult the LLM cache.
     """
-    if offline:
-        return fallback_scaffold_spec(idea_line, template=template), True
     messages = build_scaffold_prompt(
         idea_line=idea_line,
         pillar_hint=pillar_hint,
@@ -4511,6 +5536,8 @@ def generate_scaffold_spec(
         provider=DEFAULT_IDEA_PROVIDER,
         model=DEFAULT_IDEA_MODEL,
         messages=messages,
+        cache_dir=notes_root / LLM_CACHE_DIRNAME,
+        cache_only=offline,
     )
     spec = parse_scaffold_spec(content) if content else None
     fallback_used = False
@@ -4547,20 +5574,22 @@ def build_scaffold_prompt(
     return [{"role": "system", "content": system}, {"role": "user", "content": user}]
 
 
+# Shared decoder for pulling a JSON object out of surrounding model chatter.
+SCAFFOLD_JSON_DECODER = json.JSONDecoder()
+
+
 def parse_scaffold_spec(content: Optional[str]) -> Optional[dict[str, Any]]:
     """
     Parse scaffold JSON from model output.
     """
     if not content:
         return None
-    text = content.strip()
-    if "{" in text and "}" in text:
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1:
-            text = text[start : end + 1]
+    # Decode the first object in place; models often wrap it in prose or code fences.
+    start = content.find("{")
+    if start == -1:
+        return None
     try:
-        data = json.loads(text)
+        data, _ = SCAFFOLD_JSON_DECODER.raw_decode(content, start)
     except json.JSONDecodeError:
         return None
     if not isinstance(data, dict):
@@ -4573,12 +5602,9 @@ def parse_scaffold_spec(content: Optional[str]) -> Optional[dict[str, Any]]:
     return data
 
 
-def fallback_scaffold_spec(idea_line: str, template: str) -> dict[str, Any]:
-    """
-    Deterministic scaffold packs for offline use (script + fastapi).
-    """
-    title = strip_idea_prefix(idea_line) or "Kata"
-    packs = {
+# Offline scaffold packs per template; fallback_scaffold_spec copies a pack before filling it in.
+FALLBACK_SCAFFOLD_PACKS: Mapping[str, list[dict[str, Any]]] = MappingProxyType(
+    {
         "script": [
             {
                 "title": "String cleanup + counts",
@@ -4672,7 +5698,15 @@ def fallback_scaffold_spec(idea_line: str, template: str) -> dict[str, Any]:
             }
         ],
     }
-    chosen_pack = packs.get(template) or packs["script"]
+)
+
+
+def fallback_scaffold_spec(idea_line: str, template: str) -> dict[str, Any]:
+    """
+    Deterministic scaffold packs for offline use (script + fastapi).
+    """
+    title = strip_idea_prefix(idea_line) or "Kata"
+    chosen_pack = FALLBACK_SCAFFOLD_PACKS.get(template) or FALLBACK_SCAFFOLD_PACKS["script"]
     idx = sum(ord(c) for c in title) % len(chosen_pack)
     pack = chosen_pack[idx]
     pack = dict(pack)
@@ -4682,6 +5716,90 @@ def fallback_scaffold_spec(idea_line: str, template: str) -> dict[str, Any]:
     return pack
 
 
+# Fixed parts of the generated main.py / test_main.py; apply_kata_scaffold fills in the per-function
+# and per-route blocks between them.
+SCRIPT_MAIN_HEADER = '''"""Auto-generated scaffold stubs. Replace with your implementation."""
+
+def main() -> None:
+    print("{title}: implement functions and run tests")
+'''
+SCRIPT_TEST_HEADER = '''"""Auto-generated tests for the scaffold. Edit as needed."""
+import unittest
+from main import {imports}  # type: ignore
+
+class ScaffoldTests(unittest.TestCase):
+    def test_main_runs(self) -> None:
+        self.assertIsNone(main())
+'''
+FASTAPI_MAIN_HEADER = '''"""Auto-generated FastAPI scaffold. Fill in route logic."""
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+app = FastAPI(title="{title}")
+'''
+FASTAPI_PAYLOAD_MODEL = """class StatsPayload(BaseModel):
+    values: list[float]
+"""
+FASTAPI_MAIN_FOOTER = """
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)"""
+FASTAPI_TEST_HEADER = '''"""Auto-generated tests for the FastAPI scaffold. Edit as needed."""
+import unittest
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+class ScaffoldTests(unittest.TestCase):
+    def test_health_exists(self) -> None:
+        resp = client.get('/health')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsInstance(resp.json(), dict)
+'''
+
+# One test per route, keyed by (has body example, has response example).
+FASTAPI_ROUTE_TEST_TEMPLATES: Mapping[tuple[bool, bool], str] = MappingProxyType(
+    {
+        (False, False): (
+            "    def test_{method}_{slug}(self) -> None:\n"
+            "        resp = client.{method}(\"{path}\", params={params!r})\n"
+            "        self.assertEqual(resp.status_code, 200)\n"
+        ),
+        (False, True): (
+            "    def test_{method}_{slug}(self) -> None:\n"
+            "        resp = client.{method}(\"{path}\", params={params!r})\n"
+            "        self.assertEqual(resp.status_code, 200)\n"
+            "        self.assertEqual(resp.json(), {response!r})\n"
+        ),
+        (True, False): (
+            "    def test_{method}_{slug}(self) -> None:\n"
+            "        payload = {payload!r}\n"
+            "        resp = client.{method}(\"{path}\", json=payload)\n"
+            "        self.assertEqual(resp.status_code, 200)\n"
+        ),
+        (True, True): (
+            "    def test_{method}_{slug}(self) -> None:\n"
+            "        payload = {payload!r}\n"
+            "        resp = client.{method}(\"{path}\", json=payload)\n"
+            "        self.assertEqual(resp.status_code, 200)\n"
+            "        self.assertEqual(resp.json(), {response!r})\n"
+        ),
+    }
+)
+
+
+def write_blocks(path: Path, blocks: list[str]) -> None:
+    """
+    Write newline-separated blocks straight to the file, without joining them into one string first.
+    """
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write(blocks[0])
+        for block in blocks[1:]:
+            handle.write("\n")
+            handle.write(block)
+
+
 def apply_kata_scaffold(
     target_dir: Path,
     spec: dict[str, Any],
@@ -4691,9 +5809,7 @@ def apply_kata_scaffold(
     """
     Materialize kata.md, stubs, and tests from a scaffold spec.
     """
-    tests_dir = target_dir / "tests"
-    tests_dir.mkdir(parents=True, exist_ok=True)
-    (tests_dir / "__init__.py").write_text("", encoding="utf-8")
+    tests_dir = ensure_tests_package(target_dir)
 
     idea_title = spec.get("title") or "Kata"
     summary = spec.get("summary") or "Implement the functions and make the tests pass."
@@ -4712,12 +5828,14 @@ def apply_kata_scaffold(
         "",
         "## Functions to implement",
     ]
+    # Bound appends: these builders run a few hundred appends per scaffold.
+    add_md = md_lines.append
     if template == "script":
         for fn in functions:
-            md_lines.append(f"- {fn.get('name', 'function')}: {fn.get('description', 'Describe the behavior.')}")
+            add_md(f"- {fn.get('name', 'function')}: {fn.get('description', 'Describe the behavior.')}")
             example = fn.get("example") or {}
             if example:
-                md_lines.append(f"  - Example args: {example.get('args', [])}, kwargs: {example.get('kwargs', {})}, output: {example.get('output')}")
+                add_md(f"  - Example args: {example.get('args', [])}, kwargs: {example.get('kwargs', {})}, output: {example.get('output')}")
             edge = fn.get("edge_cases") or []
             if edge:
                 edge_strs = []
@@ -4729,17 +5847,17 @@ def apply_kata_scaffold(
                             edge_strs.append(json.dumps(item))
                     else:
                         edge_strs.append(str(item))
-                md_lines.append(f"  - Edge cases: {', '.join(edge_strs)}")
+                add_md(f"  - Edge cases: {', '.join(edge_strs)}")
     else:
-        md_lines.append("Implement the FastAPI routes below:")
+        add_md("Implement the FastAPI routes below:")
         for route in routes:
-            md_lines.append(f"- {route.get('method', 'get').upper()} {route.get('path')}: {route.get('summary', '')}")
+            add_md(f"- {route.get('method', 'get').upper()} {route.get('path')}: {route.get('summary', '')}")
             if route.get("response_example"):
-                md_lines.append(f"  - Response example: {route['response_example']}")
+                add_md(f"  - Response example: {route['response_example']}")
             if route.get("query_params"):
-                md_lines.append(f"  - Query params: {route['query_params']}")
+                add_md(f"  - Query params: {route['query_params']}")
             if route.get("body_example"):
-                md_lines.append(f"  - Body example: {route['body_example']}")
+                add_md(f"  - Body example: {route['body_example']}")
     md_lines.extend(
         [
             "",
@@ -4761,7 +5879,7 @@ def apply_kata_scaffold(
                 "- Hit health: curl http://127.0.0.1:8000/health",
             ]
         )
-        md_lines.append("- Start with tests, then fill in stubs.")
+        add_md("- Start with tests, then fill in stubs.")
     if overwrite_existing or not kata_md.exists():
         kata_md.write_text("\n".join(md_lines), encoding="utf-8")
 
@@ -4769,20 +5887,12 @@ def apply_kata_scaffold(
 
     main_py = target_dir / "main.py"
     tests_path = tests_dir / "test_main.py"
+    # Each file is a "\n".join of blocks; a block ending in "\n" leaves a blank line after it.
+    main_blocks: list[str] = []
+    if mission_header_lines:
+        main_blocks.append("\n".join(mission_header_lines) + "\n")
     if template == "script":
-        main_lines: list[str] = []
-        if mission_header_lines:
-            main_lines.extend(mission_header_lines)
-            main_lines.append("")
-        main_lines.extend(
-            [
-                '"""Auto-generated scaffold stubs. Replace with your implementation."""',
-                "",
-                "def main() -> None:",
-                f"    print(\"{idea_title}: implement functions and run tests\")",
-                "",
-            ]
-        )
+        main_blocks.append(SCRIPT_MAIN_HEADER.format(title=idea_title))
         for fn in functions:
             signature = (fn.get("signature") or f"def {fn.get('name', 'task')}(*args, **kwargs)").strip()
             if not signature.startswith("def "):
@@ -4790,9 +5900,7 @@ def apply_kata_scaffold(
             if not signature.rstrip().endswith(":"):
                 signature = signature.rstrip() + ":"
             desc = summarize_text(fn.get("description", ""), 120)
-            main_lines.append(signature)
-            if desc:
-                main_lines.append(f"    \"\"\"{desc}\"\"\"")
+            doc_line = f"    \"\"\"{desc}\"\"\"\n" if desc else ""
             # Add a gentle hint for beginners
             hint = ""
             name = fn.get("name", "").lower()
@@ -4804,27 +5912,14 @@ def apply_kata_scaffold(
                 hint = "return a * b"
             elif name.startswith("div"):
                 hint = "return a / b  # handle b == 0 if you want"
-            if hint:
-                main_lines.append(f"    # hint: {hint}")
-            else:
-                main_lines.append("    # TODO: replace this with your solution")
-            main_lines.append("    pass")
-            main_lines.append("")
+            hint_line = f"    # hint: {hint}" if hint else "    # TODO: replace this with your solution"
+            main_blocks.append(f"{signature}\n{doc_line}{hint_line}\n    pass\n")
         if overwrite_existing or not main_py.exists():
-            main_py.write_text("\n".join(main_lines), encoding="utf-8")
+            write_blocks(main_py, main_blocks)
 
         fn_names = [fn.get("name", "") for fn in functions if fn.get("name")]
         imports = ", ".join(["main"] + [name for name in fn_names if name])
-        test_lines = [
-            '"""Auto-generated tests for the scaffold. Edit as needed."""',
-            "import unittest",
-            f"from main import {imports}  # type: ignore",
-            "",
-            "class ScaffoldTests(unittest.TestCase):",
-            "    def test_main_runs(self) -> None:",
-            "        self.assertIsNone(main())",
-            "",
-        ]
+        test_blocks = [SCRIPT_TEST_HEADER.format(imports=imports)]
         for fn in functions:
             name = fn.get("name")
             if not name:
@@ -4833,101 +5928,69 @@ def apply_kata_scaffold(
             args = _coerce_example_value(example.get("args", []))
             kwargs = _coerce_example_value(example.get("kwargs", {}))
             expected = _coerce_example_value(example.get("output"))
-            test_lines.append(f"    def test_{name}_example(self) -> None:")
-            test_lines.append(f"        args = {repr(args)}")
-            test_lines.append(f"        kwargs = {repr(kwargs)}")
-            test_lines.append(f"        result = {name}(*args, **kwargs)")
             if expected is not None:
-                test_lines.append(f"        self.assertEqual(result, {repr(expected)})")
+                check = f"        self.assertEqual(result, {repr(expected)})"
             else:
-                test_lines.append("        self.fail('Add an expected value for this example')")
-            test_lines.append("")
+                check = "        self.fail('Add an expected value for this example')"
+            test_blocks.append(
+                f"    def test_{name}_example(self) -> None:\n"
+                f"        args = {repr(args)}\n"
+                f"        kwargs = {repr(kwargs)}\n"
+                f"        result = {name}(*args, **kwargs)\n"
+                f"{check}\n"
+            )
         if overwrite_existing or not tests_path.exists():
-            tests_path.write_text("\n".join(test_lines), encoding="utf-8")
+            write_blocks(tests_path, test_blocks)
     else:
-        main_lines = []
-        if mission_header_lines:
-            main_lines.extend(mission_header_lines)
-            main_lines.append("")
-        main_lines.extend(
-            [
-                '"""Auto-generated FastAPI scaffold. Fill in route logic."""',
-                "from fastapi import FastAPI, HTTPException",
-                "from pydantic import BaseModel",
-                "",
-                f"app = FastAPI(title=\"{idea_title}\")",
-                "",
-            ]
-        )
-        needs_payload = any(route.get("body_example") for route in routes)
-        if needs_payload:
-            main_lines.append("class StatsPayload(BaseModel):")
-            main_lines.append("    values: list[float]")
-            main_lines.append("")
+        # (method, path, slug) per route, shared by the handlers and their tests.
+        route_ids: list[tuple[str, str, str]] = []
         for route in routes:
-            method = route.get("method", "get").lower()
             path = route.get("path", "/")
-            fn_name = route.get("name") or f"{method}_{path.strip('/').replace('/', '_') or 'root'}"
-            main_lines.append(f"@app.{method}(\"{path}\")")
-            signature = f"def {fn_name}("
+            route_ids.append((route.get("method", "get").lower(), path, path.strip("/").replace("/", "_") or "root"))
+
+        main_blocks.append(FASTAPI_MAIN_HEADER.format(title=idea_title))
+        if any(route.get("body_example") for route in routes):
+            main_blocks.append(FASTAPI_PAYLOAD_MODEL)
+        for route, (method, path, slug) in zip(routes, route_ids):
+            fn_name = route.get("name") or f"{method}_{slug}"
             params: list[str] = []
             if route.get("query_params"):
                 for key, default in route["query_params"].items():
                     params.append(f"{key}: str")
             if route.get("body_example"):
                 params.append("payload: StatsPayload")
-            signature += ", ".join(params) + ") -> dict[str, object]:"
-            main_lines.append(signature)
             desc = summarize_text(route.get("summary", ""), 120)
-            if desc:
-                main_lines.append(f"    \"\"\"{desc}\"\"\"")
-            main_lines.append("    # TODO: return a JSON-friendly dict with your result")
-            main_lines.append("    return {\"message\": \"Hello from your API\"}")
-            main_lines.append("")
-        main_lines.append("")
-        main_lines.append("if __name__ == \"__main__\":")
-        main_lines.append("    import uvicorn")
-        main_lines.append("    uvicorn.run(\"main:app\", host=\"0.0.0.0\", port=8000, reload=True)")
+            doc_line = f"    \"\"\"{desc}\"\"\"\n" if desc else ""
+            main_blocks.append(
+                f"@app.{method}(\"{path}\")\n"
+                f"def {fn_name}({', '.join(params)}) -> dict[str, object]:\n"
+                f"{doc_line}"
+                "    # TODO: return a JSON-friendly dict with your result\n"
+                "    return {\"message\": \"Hello from your API\"}\n"
+            )
+        main_blocks.append(FASTAPI_MAIN_FOOTER)
         if overwrite_existing or not main_py.exists():
-            main_py.write_text("\n".join(main_lines), encoding="utf-8")
+            write_blocks(main_py, main_blocks)
 
-        test_lines = [
-            '"""Auto-generated tests for the FastAPI scaffold. Edit as needed."""',
-            "import unittest",
-            "from fastapi.testclient import TestClient",
-            "from main import app",
-            "",
-            "client = TestClient(app)",
-            "",
-            "class ScaffoldTests(unittest.TestCase):",
-            "    def test_health_exists(self) -> None:",
-            "        resp = client.get('/health')",
-            "        self.assertEqual(resp.status_code, 200)",
-            "        self.assertIsInstance(resp.json(), dict)",
-            "",
-        ]
-        for route in routes:
-            path = route.get("path", "/")
-            method = route.get("method", "get").lower()
+        test_blocks = [FASTAPI_TEST_HEADER]
+        for route, (method, path, slug) in zip(routes, route_ids):
             response_example = route.get("response_example")
-            query_params = route.get("query_params") or {}
             body_example = route.get("body_example")
-            test_lines.append(f"    def test_{method}_{path.strip('/').replace('/', '_') or 'root'}(self) -> None:")
-            if body_example:
-                test_lines.append(f"        payload = {repr(body_example)}")
-                test_lines.append(f"        resp = client.{method}(\"{path}\", json=payload)")
-            else:
-                params_repr = repr(query_params)
-                if method == "get":
-                    test_lines.append(f"        resp = client.get(\"{path}\", params={params_repr})")
-                else:
-                    test_lines.append(f"        resp = client.{method}(\"{path}\", params={params_repr})")
-            test_lines.append("        self.assertEqual(resp.status_code, 200)")
-            if response_example is not None:
-                test_lines.append("        self.assertEqual(resp.json(), " + repr(response_example) + ")")
-            test_lines.append("")
+            template_key = (bool(body_example), response_example is not None)
+            test_blocks.append(
+                FASTAPI_ROUTE_TEST_TEMPLATES[template_key].format_map(
+                    {
+                        "method": method,
+                        "path": path,
+                        "slug": slug,
+                        "payload": body_example,
+                        "params": route.get("query_params") or {},
+                        "response": response_example,
+                    }
+                )
+            )
         if overwrite_existing or not tests_path.exists():
-            tests_path.write_text("\n".join(test_lines), encoding="utf-8")
+            write_blocks(tests_path, test_blocks)
 
 
 def _coerce_example_value(value: Any) -> Any:
@@ -4962,41 +6025,39 @@ def handle_scaffold_refresh(args: argparse.Namespace) -> int:
         template=template,
         overwrite_existing=False,
     )
+    invalidate_fs_caches()
     print(f"Scaffold refreshed for {args.project} (template={template}). Existing files kept.")
     return 0
 
 
+@mtime_cached(lambda project_dir: (project_dir / "README.md",), maxsize=256)
 def read_kata_title(project_dir: Path) -> str:
     """
     Infer kata title from README first line.
     """
-    readme = project_dir / "README.md"
-    if not readme.exists():
-        return ""
-    first_line = readme.read_text().splitlines()
-    if not first_line:
+    try:
+        with (project_dir / "README.md").open("r", encoding="utf-8", errors="replace") as handle:
+            first_line = next(handle, "")
+    except FileNotFoundError:
         return ""
-    line = first_line[0].lstrip("#").strip()
-    return line or ""
+    return HEADING_PREFIX_RE.sub("", first_line).strip()
 
 
+@mtime_cached(lambda project_dir: (project_dir / "README.md", project_dir / "requirements.txt"), maxsize=256)
 def infer_kata_template(project_dir: Path) -> str:
     """
     Infer template type from README or files.
     """
-    readme = (project_dir / "README.md").read_text() if (project_dir / "README.md").exists() else ""
-    if "Template: fastapi" in readme:
+    if readme_declares_fastapi(project_dir):
         return "fastapi"
-    if (project_dir / "requirements.txt").exists() and "fastapi" in (project_dir / "requirements.txt").read_text().lower():
+    if "fastapi" in read_or_empty(project_dir / "requirements.txt").lower():
         return "fastapi"
     return "script"
 
 
-def print_banner() -> None:
-    """
-    Lightweight ASCII banner for menu mode.
-    """
-    art = [
+# ASCII banner for menu mode, joined once at import.
+BANNER = "\n".join(
+    [
         "                                        .___         __        ",
         "  ____   ____ ___  _____ __  ______   __| _/____    |__| ____  ",
         " /    \\_/ __ \\\\  \\/  /  |  \\/  ___/  / __ |/  _ \\   |  |/  _ \\ ",
@@ -5004,53 +6065,60 @@ def print_banner() -> None:
         "|___|  /\\___  >__/\\_ \\____//____  > \\____ |\\____/\\__|  |\\____/ ",
         "     \\/     \\/      \\/          \\/       \\/     \\______|      ",
     ]
-    print("\n".join(art))
+)
+
+
+def print_banner() -> None:
+    """
+    Lightweight ASCII banner for menu mode.
+    """
+    print(BANNER)
+
+
+# Smoke tests seeded into new katas, per template.
+FASTAPI_SMOKE_TEST = (
+    '"""Smoke tests for the generated FastAPI app."""\n'
+    "import importlib\n"
+    "import unittest\n"
+    "from fastapi import FastAPI\n\n"
+    "class SmokeTests(unittest.TestCase):\n"
+    "    def test_app_exposes_fastapi_instance(self) -> None:\n"
+    '        module = importlib.import_module("main")\n'
+    "        app = getattr(module, \"app\", None)\n"
+    "        self.assertIsInstance(app, FastAPI)\n\n"
+    "if __name__ == '__main__':\n"
+    "    unittest.main()\n"
+)
+SCRIPT_SMOKE_TEST = (
+    '"""Smoke tests for the generated script kata."""\n'
+    "import importlib\n"
+    "import unittest\n\n"
+    "class SmokeTests(unittest.TestCase):\n"
+    "    def test_main_executes(self) -> None:\n"
+    '        module = importlib.import_module("main")\n'
+    "        main_fn = getattr(module, \"main\", None)\n"
+    "        if callable(main_fn):\n"
+    "            main_fn()\n\n"
+    "if __name__ == '__main__':\n"
+    "    unittest.main()\n"
+)
 
 
 def seed_test_scaffold(target_dir: Path, template: str, idea_line: str, include_edge: bool) -> None:
     """
     Seed a smoke test (and optional edge-case TODOs) inside the kata.
     """
-    tests_dir = target_dir / "tests"
-    tests_dir.mkdir(parents=True, exist_ok=True)
-    (tests_dir / "__init__.py").write_text("")
+    tests_dir = ensure_tests_package(target_dir)
 
-    idea_title = strip_idea_prefix(idea_line)
     smoke_path = tests_dir / "test_smoke.py"
     if not smoke_path.exists():
-        if template == "fastapi":
-            smoke_content = (
-                '"""Smoke tests for the generated FastAPI app."""\n'
-                "import importlib\n"
-                "import unittest\n"
-                "from fastapi import FastAPI\n\n"
-                "class SmokeTests(unittest.TestCase):\n"
-                "    def test_app_exposes_fastapi_instance(self) -> None:\n"
-                '        module = importlib.import_module("main")\n'
-                "        app = getattr(module, \"app\", None)\n"
-                "        self.assertIsInstance(app, FastAPI)\n\n"
-                "if __name__ == '__main__':\n"
-                "    unittest.main()\n"
-            )
-        else:
-            smoke_content = (
-                '"""Smoke tests for the generated script kata."""\n'
-                "import importlib\n"
-                "import unittest\n\n"
-                "class SmokeTests(unittest.TestCase):\n"
-                "    def test_main_executes(self) -> None:\n"
-                '        module = importlib.import_module("main")\n'
-                "        main_fn = getattr(module, \"main\", None)\n"
-                "        if callable(main_fn):\n"
-                "            main_fn()\n\n"
-                "if __name__ == '__main__':\n"
-                "    unittest.main()\n"
-            )
+        smoke_content = FASTAPI_SMOKE_TEST if template == "fastapi" else SCRIPT_SMOKE_TEST
         smoke_path.write_text(smoke_content)
 
     if include_edge:
         edge_path = tests_dir / "test_edge_cases.py"
         if not edge_path.exists():
+            idea_title = strip_idea_prefix(idea_line)
             edge_content = (
                 '"""Edge-case TODOs to harden the kata quickly."""\n'
                 "import unittest\n\n"
@@ -5066,8 +6134,17 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     """
     Entry point for the CLI. Accepts an argv iterable to aid testing.
     """
-    parser = build_parser()
-    parsed_args = parser.parse_args(list(argv) if argv is not None else None)
+    if argv is None:
+        argv_list = sys.argv[1:]
+    elif isinstance(argv, list):
+        argv_list = argv
+    else:
+        argv_list = list(argv)
+    if argv_list == ["--version"]:
+        print(f"dojo {__version__}")
+        return 0
+    parser = build_parser(sniff_subcommand(argv_list))
+    parsed_args = parser.parse_args(argv_list)
     func = getattr(parsed_args, "func", None)
     try:
         if func is None:
@@ -5075,8 +6152,7 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
             notes_root = Path(DEFAULT_NOTES_ROOT)
             show_login_page(notes_root)
             return handle_menu(argparse.Namespace())
-        result = func(parsed_args)
-        return int(result) if isinstance(result, int) else 0
+        return func(parsed_args) or 0
     except KeyboardInterrupt:
         console.print("[yellow]Interrupted by user. Exiting.[/yellow]")
         return 1
@@ -13,6 +13,40 @@ if str(SRC_PATH) not in sys.path:
 from nexusdojo import cli  # noqa: E402  # Imported after sys.path adjustment.
 
 
+def start_llm_server(stream_lines, reply):
+    """
+    Serve keep-alive POSTs: chunked stream_lines when the body asks to stream, else reply.
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_response(200)
+            if body.get("stream"):
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for line in stream_lines:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                data = json.dumps(reply).encode("utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
 class TestCLI(unittest.TestCase):
     def test_parser_has_commands(self):
         parser = cli.build_parser()
@@ -43,6 +77,25 @@ class TestCLI(unittest.TestCase):
         exit_code = cli.main(["api-dry-run", "--message", "hi"])
         self.assertEqual(exit_code, 0)
 
+    def test_level_info_thresholds(self):
+        self.assertEqual(cli.get_level_info(0), ("Novice", "0/100"))
+        self.assertEqual(cli.get_level_info(100), ("Apprentice", "100/300"))
+        self.assertEqual(cli.get_level_info(999), ("Expert", "999/1000"))
+        self.assertEqual(cli.get_level_info(1000), ("Master", "MAX"))
+        self.assertEqual(cli.get_next_level_threshold(599), 600)
+        self.assertEqual(cli.get_next_level_threshold(1000), 9999)
+
+    def test_llm_cache_serves_offline_requests(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir) / ".llm_cache"
+            messages = [{"role": "user", "content": "idea please"}]
+            self.assertIsNone(cli.call_idea_api("ollama", "m", messages, cache_dir=cache_dir, cache_only=True))
+            key = cli.llm_cache_key("ollama", "m", messages)
+            cli.write_llm_cache(cache_dir, key, "- Cached idea")
+            cached = cli.call_idea_api("ollama", "m", messages, cache_dir=cache_dir, cache_only=True)
+            self.assertEqual(cached, "- Cached idea")
+            self.assertIsNone(cli.read_llm_cache(cache_dir, key, ttl=-1))
+
     def test_start_log_brief_flow(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             kata_root = Path(tmpdir) / "dojo_root"
@@ -235,6 +288,64 @@ class TestCLI(unittest.TestCase):
             self.assertEqual(exit_code, 0)
             self.assertTrue((kata_root / "sample-kata-2").exists())
 
+    def test_interrupted_openrouter_stream_drops_connection(self):
+        lines = [b'data: {"choices": [{"delta": {"content": "Idea %d"}}]}\n\n' % i for i in range(3)]
+        server, url = start_llm_server(lines + [b"data: [DONE]\n\n"], {"choices": [{"message": {"content": "Fresh idea"}}]})
+        previous_url, previous_key = cli.OPENROUTER_URL, os.environ.get("NEXUSDOJO_API_KEY")
+        cli.OPENROUTER_URL = url
+        os.environ["NEXUSDOJO_API_KEY"] = "test-key"
+
+        def interrupt(chunk):
+            raise KeyboardInterrupt
+
+        messages = [{"role": "user", "content": "idea"}]
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                cli.call_idea_api("openrouter", "model", messages, on_chunk=interrupt)
+            self.assertEqual(cli.call_idea_api("openrouter", "model", messages), "Fresh idea")
+        finally:
+            cli.drop_keepalive_connection(url)
+            cli.OPENROUTER_URL = previous_url
+            if previous_key is None:
+                del os.environ["NEXUSDOJO_API_KEY"]
+            else:
+                os.environ["NEXUSDOJO_API_KEY"] = previous_key
+            server.shutdown()
+            server.server_close()
+
+    def test_interrupted_ollama_stream_drops_connection(self):
+        lines = [b'{"message": {"content": "Idea %d"}, "done": false}\n' % i for i in range(3)]
+        server, url = start_llm_server(lines + [b'{"done": true}\n'], {"message": {"content": "Fresh idea"}})
+        previous_url = cli.OLLAMA_URL
+        cli.OLLAMA_URL = url
+
+        def interrupt(chunk):
+            raise KeyboardInterrupt
+
+        messages = [{"role": "user", "content": "idea"}]
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                cli.call_idea_api("ollama", "model", messages, on_chunk=interrupt)
+            self.assertEqual(cli.call_idea_api("ollama", "model", messages), "Fresh idea")
+        finally:
+            cli.drop_keepalive_connection(url)
+            cli.OLLAMA_URL = previous_url
+            server.shutdown()
+            server.server_close()
+
+    def test_recent_idea_skips_started_kata(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            kata_root = Path(tmpdir) / "dojo_root"
+            notes_root = Path(tmpdir) / "notes_root"
+            signature = cli.idea_signature("ollama", "model", None, None, None, None)
+            cli.remember_idea(notes_root, signature, "IDEA: Word counter -- count words in a file.")
+            cli.remember_idea(notes_root, signature, "IDEA: Unit converter -- convert units from the CLI.")
+            first, _ = cli.pick_idea_with_hints("ollama", "model", kata_root, notes_root, None, None, None, offline=True)
+            (kata_root / cli.slugify(cli.strip_idea_prefix(first))).mkdir(parents=True)
+            second, _ = cli.pick_idea_with_hints("ollama", "model", kata_root, notes_root, None, None, None, offline=True)
+            self.assertNotEqual(first, second)
+            self.assertEqual(second, "IDEA: Word counter -- count words in a file.")
+
 
 if __name__ == "__main__":
     unittest.main()